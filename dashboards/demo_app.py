@@ -8,8 +8,9 @@ import streamlit as st
 import pandas as pd
 
 from src.visualization.plots import histogram, bar_categories, sunburst_hierarchy
-from src.visualization.dashboard_utils import set_page_config
-from src.preprocessing.utils import read_df_csv, get_project_root
+from src.visualization.dashboard_utils import set_page_config, load_table
+from src.preprocessing.schemas import read_dataset
+from src.preprocessing.utils import read_df_columns, get_project_root
 
 
 def main():
@@ -28,7 +29,9 @@ def main():
     with tabs[0]:
         st.header("Genre Distribution Demo")
         genres_path = root / "data" / "raw" / "genres_v2" / "genres_v2.csv"
-        df_genres = read_df_csv(genres_path)
+        df_genres = read_dataset(
+            "genres_v2", genres_path, columns=["genre", "energy", "danceability", "valence"]
+        )
 
         fig1 = bar_categories(
             df_genres,
@@ -62,8 +65,9 @@ def main():
         high_path = splits_dir / "high_popularity_spotify_data.csv"
         low_path  = splits_dir / "low_popularity_spotify_data.csv"
 
-        df_high = read_df_csv(high_path)
-        df_low  = read_df_csv(low_path)
+        split_cols = ["energy", "playlist_genre"]
+        df_high = read_dataset("popularity_split", high_path, columns=split_cols)
+        df_low  = read_dataset("popularity_split", low_path, columns=split_cols)
 
         st.subheader("Energy Distribution")
         fig3 = histogram(
@@ -105,9 +109,11 @@ def main():
     with tabs[2]:
         st.header("Lyrics & Topic Themes Demo")
         lyrics_path = root / "data" / "processed" / "lyrics_features.csv"
-        df_lyrics = read_df_csv(lyrics_path)
-
-        topic_cols = [c for c in df_lyrics.columns if c.startswith("topic_")]
+        # Skip the raw lyrics text; only topic scores and labels are plotted.
+        available = read_df_columns(lyrics_path)
+        topic_cols = [c for c in available if c.startswith("topic_")]
+        label_cols = [c for c in ("main_topic", "genre") if c in available]
+        df_lyrics = load_table("lyrics_features", columns=topic_cols + label_cols)
 
         st.subheader("Average Topic Scores Across Songs")
         mean_topics = (
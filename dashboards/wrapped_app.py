@@ -18,6 +18,7 @@ from src.visualization.plots import (
     histogram,
     bar_categories,
 )
+from src.preprocessing.merge_lyrics_topics import UNMATCHED_LABEL
 
 
 set_page_config()
@@ -88,9 +89,11 @@ if topic_cols:
 
 if "main_topic" in df.columns:
     st.header("Main topic distribution")
+    # Tracks with no lyrics match carry UNMATCHED_LABEL, not a topic.
+    matched = df[df["main_topic"] != UNMATCHED_LABEL]
     st.plotly_chart(
         bar_categories(
-            df, category_col="main_topic", top_n=15,
+            matched, category_col="main_topic", top_n=15,
             title="Top main topics"
         ),
         use_container_width=True
@@ -16,6 +16,6 @@ COPY . /workspace
 EXPOSE 5000
 
 CMD python scripts/run_data_pipeline.py \
-    --pattern recently_played_*.json \
+    --pattern "recently_played_*.json" \
     --max_docs 50 \
     --local_embeddings
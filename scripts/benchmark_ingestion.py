@@ -0,0 +1,206 @@
+
+import sys
+from pathlib import Path
+
+
+project_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(project_root))
+
+import argparse
+import asyncio
+import json
+import logging
+import tempfile
+import time
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+
+from src.data_ingestion import fetch_data
+from src.data_ingestion.async_client import AsyncSpotifyClient
+from src.data_ingestion.fake_api import FakeSpotifyAPI
+from src.data_ingestion.rate_limit import RequestScheduler
+from src.data_ingestion.spotify_client import SpotifyClient
+
+
+logger = logging.getLogger(__name__)
+
+TOKEN = "benchmark-token"
+
+
+def summarize(name: str, latencies: List[float], wall: float, extra: Dict[str, Any]) -> Dict[str, Any]:
+    lat = np.array(latencies) * 1000 if latencies else np.zeros(1)
+    return {
+        "scenario": name,
+        "requests": len(latencies),
+        "wall_s": round(wall, 3),
+        "req_per_s": round(len(latencies) / wall, 1) if wall > 0 else 0.0,
+        "p50_ms": round(float(np.percentile(lat, 50)), 2),
+        "p99_ms": round(float(np.percentile(lat, 99)), 2),
+        **extra,
+    }
+
+
+def make_client(base_url: str, args: argparse.Namespace, latencies: List[float]) -> SpotifyClient:
+    scheduler = RequestScheduler(
+        rate=args.rate, burst=args.rate, initial_concurrency=args.concurrency,
+        max_concurrency=max(args.concurrency, 16), base_delay=0.05
+    )
+    client = SpotifyClient(scheduler=scheduler, api_base=base_url, access_token=TOKEN)
+    client.session.hooks["response"].append(
+        lambda r, *a, **kw: latencies.append(r.elapsed.total_seconds())
+    )
+    return client
+
+
+def run_sync(name: str, base_url: str, args, fn: Callable[[SpotifyClient], Any]) -> Dict[str, Any]:
+    latencies: List[float] = []
+    client = make_client(base_url, args, latencies)
+    start = time.perf_counter()
+    result = fn(client)
+    wall = time.perf_counter() - start
+    stats = client.scheduler.stats()
+    return summarize(name, latencies, wall, {
+        "items": result,
+        "retries": stats["retries"],
+        "throttled_s": round(stats["throttled_seconds"], 3),
+    })
+
+
+def run_async_crawl(base_url: str, args) -> Dict[str, Any]:
+    latencies: List[float] = []
+
+    class TimedClient(AsyncSpotifyClient):
+        async def _get_once(self, url, params):
+            start = time.perf_counter()
+            try:
+                return await super()._get_once(url, params)
+            finally:
+                latencies.append(time.perf_counter() - start)
+
+    scheduler = RequestScheduler(
+        rate=args.rate, burst=args.rate, initial_concurrency=args.concurrency,
+        max_concurrency=max(args.concurrency, 16), base_delay=0.05
+    )
+
+    async def crawl():
+        async with TimedClient(
+            TOKEN, api_base=base_url, concurrency=args.concurrency, scheduler=scheduler
+        ) as client:
+            return await client.crawl_playlists()
+
+    start = time.perf_counter()
+    tracks = asyncio.run(crawl())
+    wall = time.perf_counter() - start
+    stats = scheduler.stats()
+    return summarize("playlist_crawl_async", latencies, wall, {
+        "items": sum(len(t) for t in tracks.values()),
+        "retries": stats["retries"],
+        "throttled_s": round(stats["throttled_seconds"], 3),
+    })
+
+
+def run_fetch_data(base_url: str, args) -> Dict[str, Any]:
+    latencies: List[float] = []
+    client = make_client(base_url, args, latencies)
+    opts = argparse.Namespace(
+        time_range="medium_term", limit=50, offset=0, all_pages=True,
+        track_ids=None, playlist_id=None, concurrency=args.concurrency,
+        incremental=False, format="json"
+    )
+    jobs = [(rtype, opts) for rtype in fetch_data.ALL_TYPES]
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        results = fetch_data.run_jobs(client, jobs, Path(tmp), "bench", workers=4)
+        wall = time.perf_counter() - start
+    failed = [r["type"] for r in results if r["status"] != "ok"]
+    return summarize("fetch_data_all", latencies, wall, {
+        "items": len(results) - len(failed),
+        "failed": failed,
+    })
+
+
+def item_mismatches(results: List[Dict[str, Any]], expected: Dict[str, int]) -> List[str]:
+
+    # Every scenario must fetch everything the fake API holds; a faster run
+    # that drops pages is a bug, not a speedup.
+    problems = []
+    for r in results:
+        want = expected.get(r["scenario"])
+        if want is not None and r["items"] != want:
+            problems.append(f"{r['scenario']}: {r['items']} items, expected {want}")
+    crawls = {r["scenario"]: r["items"] for r in results if r["scenario"].startswith("playlist_crawl")}
+    if len(set(crawls.values())) > 1:
+        problems.append(f"playlist crawls disagree: {crawls}")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark ingestion against a local fake Spotify API"
+    )
+    parser.add_argument("--tracks", type=int, default=5000)
+    parser.add_argument("--playlists", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.02,
+                        help="Injected server latency per request (seconds)")
+    parser.add_argument("--page_size", type=int, default=50)
+    parser.add_argument("--throttle_rate", type=float, default=0.0,
+                        help="Fraction of requests answered with 429")
+    parser.add_argument("--rate", type=float, default=500.0,
+                        help="Client token-bucket rate (requests/sec)")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--out", type=Path, help="Write results as JSON here")
+    args = parser.parse_args()
+
+    # The ingestion modules configure INFO logging on import; keep the table readable.
+    logging.getLogger().setLevel(logging.WARNING)
+
+    api = FakeSpotifyAPI(
+        n_tracks=args.tracks, n_playlists=args.playlists, latency=args.latency,
+        max_page_size=args.page_size, throttle_rate=args.throttle_rate, retry_after=0.2
+    )
+    with api:
+        base = api.base_url
+        track_ids = [t["id"] for t in api.tracks]
+        results = [
+            run_sync("audio_features_batched", base, args,
+                     lambda c: len(c.get_audio_features(track_ids))),
+            run_sync("saved_tracks_pages", base, args,
+                     lambda c: len(list(c.iter_user_saved_tracks()))),
+            run_sync("playlist_crawl_sequential", base, args,
+                     lambda c: sum(
+                         len(list(c.iter_playlist_tracks(p["id"], page_size=args.page_size)))
+                         for p in c.iter_user_playlists()
+                     )),
+            run_async_crawl(base, args),
+            run_fetch_data(base, args),
+        ]
+
+    n_tracks = len(api.tracks)
+    playlist_items = len(api.playlists) * api.tracks_per_playlist
+    expected = {
+        "audio_features_batched": n_tracks,
+        "saved_tracks_pages": n_tracks,
+        "playlist_crawl_sequential": playlist_items,
+        "playlist_crawl_async": playlist_items,
+        "fetch_data_all": len(fetch_data.ALL_TYPES),
+    }
+
+    header = f"{'scenario':<28}{'requests':>9}{'wall_s':>9}{'req/s':>9}{'p50_ms':>9}{'p99_ms':>9}"
+    print(header)
+    for r in results:
+        print(f"{r['scenario']:<28}{r['requests']:>9}{r['wall_s']:>9}"
+              f"{r['req_per_s']:>9}{r['p50_ms']:>9}{r['p99_ms']:>9}")
+    if args.out:
+        args.out.write_text(json.dumps(results, indent=2))
+        print(f"Wrote results to {args.out}")
+
+    problems = item_mismatches(results, expected)
+    if problems:
+        for problem in problems:
+            print(f"item count mismatch: {problem}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+import sys
+from pathlib import Path
+
+
+project_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(project_root))
+
+import argparse
+import json
+import logging
+import random
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.features.lyrical_feature_engineering import (
+    LYRIC_STAT_DTYPES,
+    compute_lyric_stats,
+    load_lyrics_data
+)
+
+
+logger = logging.getLogger(__name__)
+
+LYRICS_DIR = project_root / "data" / "raw" / "dataset5_lyrics"
+
+# Size of tcc_ceds_music.csv, used when the corpus is not on disk.
+SYNTHETIC_ROWS = 28372
+
+
+def synthetic_lyrics(n_rows: int, seed: int = 42) -> pd.Series:
+
+    rng = random.Random(seed)
+    words = ["love", "night", "baby", "don't", "heart", "fire", "oh", "yeah",
+             "dance", "tonight", "feel", "world", "time", "gonna", "away"]
+    return pd.Series([
+        " ".join(rng.choice(words) for _ in range(rng.randint(0, 250)))
+        for _ in range(n_rows)
+    ])
+
+
+def apply_stats(lyrics: pd.Series) -> Dict[str, pd.Series]:
+
+    # The four row-wise passes engineer_lyrical_features used to make.
+    def avg_word_len(text: str) -> float:
+        words = text.split()
+        if not words:
+            return 0.0
+        return sum(len(w) for w in words) / len(words)
+
+    return {
+        "char_count": lyrics.apply(len),
+        "word_count": lyrics.apply(lambda x: len(x.split())),
+        "unique_words": lyrics.apply(lambda x: len(set(x.split()))),
+        "avg_word_length": lyrics.apply(avg_word_len),
+    }
+
+
+def measure(repeats: int, fn: Callable[[], Any]) -> Tuple[float, float]:
+
+    # Best wall time over the repeats, and peak traced memory of one run.
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return min(timings), peak / (1024 * 1024)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark row-wise vs single-pass lyric statistics"
+    )
+    parser.add_argument("--lyrics_dir", type=Path, default=LYRICS_DIR)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1],
+                        help="Process counts to time the single-pass tokenizer with")
+    parser.add_argument("--out", type=Path, help="Write results as JSON here")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    if (args.lyrics_dir / "tcc_ceds_music.csv").exists():
+        lyrics = load_lyrics_data(args.lyrics_dir)["lyrics"].fillna("").astype(str)
+        source = "tcc_ceds_music.csv"
+    else:
+        lyrics = synthetic_lyrics(SYNTHETIC_ROWS)
+        source = f"synthetic ({SYNTHETIC_ROWS} rows)"
+
+    # Written features must not change. This is an explicit check, not an
+    # assert, so it also runs under python -O.
+    expected = apply_stats(lyrics)
+    failed = False
+    for workers in args.workers:
+        actual = compute_lyric_stats(lyrics, workers=workers)
+        for name in LYRIC_STAT_DTYPES:
+            differs = np.flatnonzero(expected[name].to_numpy() != actual[name])
+            if len(differs):
+                failed = True
+                print(f"{name} (workers={workers}): {len(differs)} rows differ, "
+                      f"first at rows {differs[:10].tolist()}", file=sys.stderr)
+    if failed:
+        sys.exit(1)
+
+    apply_s, apply_mb = measure(args.repeats, lambda: apply_stats(lyrics))
+    results: Dict[str, Any] = {
+        "source": source,
+        "rows": len(lyrics),
+        "apply": {"seconds": round(apply_s, 4), "peak_mb": round(apply_mb, 1)},
+    }
+    print(f"source: {source}, rows: {len(lyrics)} (statistics identical)")
+    print(f"{'method':<18}{'seconds':>10}{'peak_mb':>10}{'speedup':>9}")
+    print(f"{'apply x4':<18}{apply_s:>10.4f}{apply_mb:>10.1f}{'':>9}")
+    for workers in args.workers:
+        single_s, single_mb = measure(
+            args.repeats, lambda: compute_lyric_stats(lyrics, workers=workers)
+        )
+        speedup = round(apply_s / single_s, 2) if single_s > 0 else None
+        results[f"single_pass_{workers}"] = {
+            "seconds": round(single_s, 4),
+            "peak_mb": round(single_mb, 1),
+            "speedup": speedup,
+        }
+        label = f"single pass x{workers}"
+        print(f"{label:<18}{single_s:>10.4f}{single_mb:>10.1f}{speedup:>9}")
+    if args.out:
+        args.out.write_text(json.dumps(results, indent=2))
+        print(f"Wrote results to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+
+import sys
+from pathlib import Path
+
+
+project_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(project_root))
+
+import argparse
+import json
+import logging
+import random
+import time
+from typing import Any, Callable, Dict
+
+import pandas as pd
+
+from src.preprocessing.merge_lyrics_topics import clean_text, clean_text_series, load_lyrics_topics
+
+
+logger = logging.getLogger(__name__)
+
+LYRICS_DIR = project_root / "data" / "raw" / "dataset5_lyrics"
+
+# Size of tcc_ceds_music.csv, used when the corpus is not on disk.
+SYNTHETIC_ROWS = 28372
+
+
+def synthetic_topics(n_rows: int, seed: int = 42) -> pd.DataFrame:
+
+    rng = random.Random(seed)
+    words = ["love", "Night", "DON'T", "café", "rock-n-roll", "feat.", "Ñandú",
+             "(Remix)", "2019", "  ", "ß", "A$AP", "l'amour", "日本", "O.G."]
+    phrase = lambda k: " ".join(rng.choice(words) for _ in range(rng.randint(1, k)))
+    return pd.DataFrame({
+        "artist": [phrase(3) for _ in range(n_rows)],
+        "track": [phrase(6) for _ in range(n_rows)],
+    })
+
+
+def best_of(repeats: int, fn: Callable[[], Any]) -> float:
+
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def key_mismatches(values: pd.Series) -> pd.DataFrame:
+
+    # Rows whose vectorized key differs from the row-wise clean_text key.
+    expected = values.astype(str).apply(clean_text).astype(object)
+    actual = clean_text_series(values).astype(object)
+    differs = expected.ne(actual) & ~(expected.isna() & actual.isna())
+    return pd.DataFrame({
+        "value": values[differs],
+        "apply": expected[differs],
+        "vectorized": actual[differs],
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark row-wise vs vectorized key normalization"
+    )
+    parser.add_argument("--lyrics_dir", type=Path, default=LYRICS_DIR)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--out", type=Path, help="Write results as JSON here")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    if (args.lyrics_dir / "tcc_ceds_music.csv").exists():
+        df = load_lyrics_topics(args.lyrics_dir)
+        source = "tcc_ceds_music.csv"
+    else:
+        df = synthetic_topics(SYNTHETIC_ROWS)
+        source = f"synthetic ({SYNTHETIC_ROWS} rows)"
+
+    # The vectorized keys must be identical or the merge would change. This
+    # is an explicit check, not an assert, so it also runs under python -O.
+    failed = False
+    for col in ("artist", "track"):
+        mismatches = key_mismatches(df[col])
+        if not mismatches.empty:
+            failed = True
+            print(f"{col}: {len(mismatches)} keys differ", file=sys.stderr)
+            print(mismatches.head(20).to_string(), file=sys.stderr)
+    if failed:
+        sys.exit(1)
+
+    results: Dict[str, Any] = {"source": source, "rows": len(df)}
+    for col in ("artist", "track"):
+        row_s = best_of(args.repeats, lambda: df[col].astype(str).apply(clean_text))
+        vec_s = best_of(args.repeats, lambda: clean_text_series(df[col]))
+        results[col] = {
+            "apply_s": round(row_s, 4),
+            "vectorized_s": round(vec_s, 4),
+            "speedup": round(row_s / vec_s, 2) if vec_s > 0 else None,
+        }
+
+    print(f"source: {source}, rows: {len(df)} (keys identical)")
+    print(f"{'column':<10}{'apply_s':>10}{'vector_s':>10}{'speedup':>9}")
+    for col in ("artist", "track"):
+        r = results[col]
+        print(f"{col:<10}{r['apply_s']:>10}{r['vectorized_s']:>10}{r['speedup']:>9}")
+    if args.out:
+        args.out.write_text(json.dumps(results, indent=2))
+        print(f"Wrote results to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,3 @@
-
 import sys
 from pathlib import Path
 
@@ -6,18 +5,11 @@ from pathlib import Path
 project_root = Path(__file__).resolve().parents[1]
 sys.path.insert(0, str(project_root))
 
+import argparse
 import logging
-from typing import Optional
-
 
-from src.preprocessing.clean_audio_features import main as clean_audio_main
-from src.preprocessing.merge_lyrics_topics import main as merge_topics_main
-from src.features.audio_feature_engineering import main as audio_feat_main
-from src.features.lyrical_feature_engineering import main as lyrical_feat_main
-from src.models.genre_classifier import train_and_save as genre_main
-from src.models.popularity_predictor import train_and_save as pop_main
-from src.models.time_series_forecast import train_and_save as ts_main
-from src.rag_chat.indexer import main as rag_index_main
+from src.pipeline.runner import run_pipeline
+from src.pipeline.steps import PIPELINE_STEPS, dependency_graph
 
 
 def setup_logging() -> None:
@@ -28,45 +20,81 @@ def setup_logging() -> None:
     )
 
 
-def run_rag_index_step(
-    pattern: str = "recently_played_*.json",
-    max_docs: Optional[int] = None,
-    use_local: bool = True,
-) -> None:
-    
-    logging.info("Building RAG index")
-    rag_index_main(pattern, max_docs, use_local)
-
-
 def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Run the data pipeline, skipping steps whose inputs and code are unchanged"
+    )
+    parser.add_argument(
+        "--force",
+        nargs="+",
+        metavar="STEP",
+        default=[],
+        help="Re-run these steps even if up to date ('all' for every step)"
+    )
+    parser.add_argument(
+        "--cpus",
+        type=int,
+        default=None,
+        help="CPU budget shared by concurrently running steps (default: all cores)"
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Write a cProfile dump per executed step next to the run report"
+    )
+    parser.add_argument(
+        "--report_dir",
+        type=Path,
+        default=None,
+        help="Where to write the JSON run report (default: reports/pipeline_runs)"
+    )
+    parser.add_argument("--list", action="store_true", help="List pipeline steps and exit")
+    rag = parser.add_argument_group("rag_index step")
+    rag.add_argument("--pattern", help="Raw recently-played files to index")
+    rag.add_argument("--max_docs", type=int, help="Index at most this many documents")
+    rag.add_argument(
+        "--local_embeddings",
+        action=argparse.BooleanOptionalAction,
+        default=None,
+        help="Embed with a local sentence-transformers model (default: on)"
+    )
+    args = parser.parse_args()
+
+    overrides = {
+        key: value for key, value in (
+            ("pattern", args.pattern),
+            ("max_docs", args.max_docs),
+            ("use_local", args.local_embeddings),
+        ) if value is not None
+    }
+    steps = [
+        step.with_kwargs(**overrides) if step.name == "rag_index" and overrides else step
+        for step in PIPELINE_STEPS
+    ]
+
+    if args.list:
+        graph = dependency_graph(steps)
+        for step in steps:
+            after = ", ".join(graph[step.name]) or "-"
+            print(f"{step.name:<28}{step.target:<50}after: {after}")
+        return
+
     setup_logging()
     logging.info("Starting full data pipeline run")
-
-    logging.info("Cleaning raw audio features")
-    clean_audio_main()
-
-    logging.info("Merging lyrics & topic features")
-    merge_topics_main()
-
-    logging.info("Engineering audio features")
-    audio_feat_main()
-
-    logging.info("Engineering lyrical features")
-    lyrical_feat_main()
-
-    logging.info("Training genre classifier")
-    genre_main()
-
-    logging.info("Training popularity predictor")
-    pop_main()
-
-    logging.info("Fitting time-series forecast")
-    ts_main()
-
-    
-    run_rag_index_step()
-
-    logging.info("Data pipeline completed successfully")
+    results = run_pipeline(
+        steps=steps, force=args.force, cpus=args.cpus, report_dir=args.report_dir, profile=args.profile
+    )
+    counts = {s: sum(1 for v in results.values() if v == s) for s in ("ran", "skipped", "failed", "blocked")}
+    if counts["failed"] or counts["blocked"]:
+        bad = [name for name, status in results.items() if status in ("failed", "blocked")]
+        logging.error("Data pipeline finished with errors: %s", ", ".join(
+            f"{name} ({results[name]})" for name in bad
+        ))
+        sys.exit(1)
+    logging.info(
+        "Data pipeline completed successfully (%d ran, %d skipped)",
+        counts["ran"], counts["skipped"]
+    )
 
 
 if __name__ == "__main__":
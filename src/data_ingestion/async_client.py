@@ -0,0 +1,168 @@
+import asyncio
+import logging
+from typing import List, Dict, Any, Optional
+
+import aiohttp
+
+from src.data_ingestion.rate_limit import RequestScheduler
+from src.data_ingestion.spotify_client import API_BASE, SpotifyClient
+
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncSpotifyClient:
+
+
+    def __init__(
+        self,
+        access_token: str,
+        api_base: str = API_BASE,
+        concurrency: int = 8,
+        timeout: float = 10.0,
+        scheduler: Optional[RequestScheduler] = None
+    ):
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        self.access_token = access_token
+        self.api_base = api_base if api_base.endswith("/") else api_base + "/"
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.scheduler = scheduler
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    @classmethod
+    def from_client(cls, client: SpotifyClient, **kwargs) -> "AsyncSpotifyClient":
+
+        kwargs.setdefault("scheduler", client.scheduler)
+        kwargs.setdefault("api_base", client.api_base)
+        return cls(access_token=client.user_access_token(), **kwargs)
+
+    async def __aenter__(self) -> "AsyncSpotifyClient":
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._session = aiohttp.ClientSession(
+            headers={"Authorization": f"Bearer {self.access_token}"},
+            connector=aiohttp.TCPConnector(limit=self.concurrency),
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+        )
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def get(self, path: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+
+        if self._session is None:
+            raise RuntimeError("AsyncSpotifyClient must be used as 'async with'")
+        url = self.api_base + path.lstrip("/")
+        async with self._semaphore:
+            if self.scheduler is not None:
+                return await self.scheduler.acall(self._get_once, url, params)
+            return await self._get_once(url, params)
+
+    async def _get_once(self, url: str, params: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        async with self._session.get(url, params=params) as resp:
+            resp.raise_for_status()
+            return await resp.json()
+
+    async def _get_all_pages(
+        self,
+        path: str,
+        page_size: int,
+        params: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        base_params = dict(params or {}, limit=page_size)
+        first = await self.get(path, dict(base_params, offset=0))
+        total = int(first.get("total") or 0)
+        items = list(first.get("items") or [])
+
+        # The server may cap the page size below the one requested, so the
+        # remaining spans are sized by what the first page actually held.
+        step = len(items)
+        if not step or step >= total:
+            return items
+
+        async def fetch_span(start: int, end: int) -> List[Dict[str, Any]]:
+            # Short pages inside a span are followed up until the span is full.
+            span: List[Dict[str, Any]] = []
+            offset = start
+            while offset < end:
+                page = await self.get(path, dict(base_params, offset=offset))
+                got = page.get("items") or []
+                if not got:
+                    break
+                span.extend(got[:end - offset])
+                offset += len(got)
+            return span
+
+        # Once the first page reveals the total, the rest can be requested at once.
+        rest = await asyncio.gather(*(
+            fetch_span(offset, min(offset + step, total))
+            for offset in range(step, total, step)
+        ))
+        for span in rest:
+            items.extend(span)
+        return items
+
+    async def get_user_playlists(self, page_size: int = 50) -> List[Dict[str, Any]]:
+
+        logger.info("Fetching all user playlists (page_size=%d)", page_size)
+        return await self._get_all_pages("me/playlists", page_size)
+
+    async def get_playlist_tracks(
+        self,
+        playlist_id: str,
+        page_size: int = 100
+    ) -> List[Dict[str, Any]]:
+
+        logger.debug("Fetching all tracks for playlist %s", playlist_id)
+        return await self._get_all_pages(f"playlists/{playlist_id}/tracks", page_size)
+
+    async def crawl_playlists(
+        self,
+        playlist_ids: Optional[List[str]] = None
+    ) -> Dict[str, List[Dict[str, Any]]]:
+
+        if playlist_ids is None:
+            playlists = await self.get_user_playlists()
+            playlist_ids = [p["id"] for p in playlists if p and p.get("id")]
+
+        logger.info(
+            "Crawling %d playlists (concurrency=%d)", len(playlist_ids), self.concurrency
+        )
+        results = await asyncio.gather(
+            *(self.get_playlist_tracks(pid) for pid in playlist_ids),
+            return_exceptions=True
+        )
+
+        tracks: Dict[str, List[Dict[str, Any]]] = {}
+        for pid, result in zip(playlist_ids, results):
+            if isinstance(result, Exception):
+                logger.error("Error crawling playlist %s: %s", pid, result)
+                continue
+            tracks[pid] = result
+        logger.info(
+            "Crawled %d tracks across %d playlists",
+            sum(len(t) for t in tracks.values()), len(tracks)
+        )
+        return tracks
+
+
+def crawl_playlists(
+    access_token: str,
+    playlist_ids: Optional[List[str]] = None,
+    **kwargs
+) -> Dict[str, List[Dict[str, Any]]]:
+
+
+    async def _run():
+        async with AsyncSpotifyClient(access_token, **kwargs) as client:
+            return await client.crawl_playlists(playlist_ids)
+
+    return asyncio.run(_run())
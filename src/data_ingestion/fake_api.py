@@ -0,0 +1,286 @@
+import argparse
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+import logging
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+
+logger = logging.getLogger(__name__)
+
+
+AUDIO_FEATURE_KEYS = [
+    "danceability", "energy", "speechiness", "acousticness",
+    "instrumentalness", "liveness", "valence"
+]
+
+
+class FakeSpotifyAPI:
+
+
+    def __init__(
+        self,
+        n_tracks: int = 5000,
+        n_playlists: int = 200,
+        tracks_per_playlist: int = 150,
+        n_plays: int = 50,
+        latency: float = 0.02,
+        latency_jitter: float = 0.0,
+        max_page_size: int = 50,
+        throttle_rate: float = 0.0,
+        retry_after: float = 1.0,
+        seed: int = 42,
+        host: str = "127.0.0.1",
+        port: int = 0
+    ):
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.max_page_size = max_page_size
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.stats: Dict[str, int] = {"requests": 0, "throttled": 0, "not_modified": 0}
+
+        self.tracks = [self._make_track(i) for i in range(n_tracks)]
+        self.features = {t["id"]: self._make_features(t) for t in self.tracks}
+        self.playlists = [
+            {
+                "id": f"pl{i:020d}",
+                "name": f"Playlist {i}",
+                "owner": {"display_name": "bench"},
+                "public": bool(i % 2),
+                "tracks": {"total": tracks_per_playlist},
+            }
+            for i in range(n_playlists)
+        ]
+        self._playlist_ids = {p["id"]: i for i, p in enumerate(self.playlists)}
+        self.tracks_per_playlist = tracks_per_playlist
+        now = datetime(2025, 4, 28, tzinfo=timezone.utc)
+        self.plays = [
+            {
+                "played_at": (now - timedelta(minutes=4 * i)).isoformat(
+                    timespec="milliseconds").replace("+00:00", "Z"),
+                "track": self.tracks[i % n_tracks],
+            }
+            for i in range(n_plays)
+        ]
+
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1/"
+
+    def _make_track(self, i: int) -> Dict[str, Any]:
+        tid = hashlib.md5(str(i).encode()).hexdigest()[:22]
+        return {
+            "id": tid,
+            "name": f"Track {i}",
+            "popularity": i % 100,
+            "duration_ms": 120000 + (i * 7919) % 180000,
+            "explicit": i % 5 == 0,
+            "album": {"name": f"Album {i // 10}", "release_date": "2020-01-01"},
+            "artists": [{"id": f"ar{i % 500}", "name": f"Artist {i % 500}"}],
+        }
+
+    def _make_features(self, track: Dict[str, Any]) -> Dict[str, Any]:
+        rng = random.Random(track["id"])
+        feat = {k: round(rng.random(), 4) for k in AUDIO_FEATURE_KEYS}
+        feat.update({
+            "id": track["id"],
+            "key": rng.randrange(12),
+            "mode": rng.randrange(2),
+            "loudness": round(rng.uniform(-30, 0), 3),
+            "tempo": round(rng.uniform(60, 200), 3),
+            "duration_ms": track["duration_ms"],
+            "time_signature": 4,
+        })
+        return feat
+
+    # -- request routing ---------------------------------------------------
+
+    def _page(
+        self,
+        url: str,
+        items: List[Any],
+        params: Dict[str, str],
+        default_limit: int = 20
+    ) -> Dict[str, Any]:
+        limit = min(int(params.get("limit", default_limit)), self.max_page_size)
+        offset = int(params.get("offset", 0))
+        page = items[offset:offset + limit]
+        following = offset + limit
+        next_url = None
+        if following < len(items):
+            next_url = f"{url}?{urlencode(dict(params, offset=following, limit=limit))}"
+        return {
+            "href": url,
+            "items": page,
+            "limit": limit,
+            "offset": offset,
+            "total": len(items),
+            "next": next_url,
+            "previous": None,
+        }
+
+    def route(self, path: str, params: Dict[str, str]) -> Tuple[int, Any]:
+
+        url = self.base_url + path
+        if path == "me":
+            return 200, {"id": "bench_user", "display_name": "Bench", "country": "US"}
+        if path in ("me/top/tracks", "me/top/artists"):
+            if path.endswith("tracks"):
+                items = self.tracks[:100]
+            else:
+                items = list({a["id"]: a for t in self.tracks for a in t["artists"]}.values())
+            return 200, self._page(url, items, params)
+        if path == "me/tracks":
+            saved = [
+                {"added_at": "2025-01-01T00:00:00Z", "track": t} for t in self.tracks
+            ]
+            return 200, self._page(url, saved, params)
+        if path == "me/playlists":
+            return 200, self._page(url, self.playlists, params)
+        if path == "me/player/recently-played":
+            limit = min(int(params.get("limit", 20)), 50)
+            plays = self.plays
+            if "after" in params:
+                after = int(params["after"])
+                plays = [
+                    p for p in plays
+                    if datetime.fromisoformat(p["played_at"].replace("Z", "+00:00"))
+                    .timestamp() * 1000 > after
+                ]
+            return 200, {"items": plays[:limit], "next": None, "cursors": None}
+        if path == "audio-features":
+            ids = [i for i in params.get("ids", "").split(",") if i]
+            if len(ids) > 100:
+                return 400, {"error": {"status": 400, "message": "Too many ids requested"}}
+            return 200, {"audio_features": [self.features.get(i) for i in ids]}
+
+        m = re.fullmatch(r"audio-features/([^/]+)", path)
+        if m:
+            feat = self.features.get(m.group(1))
+            return (200, feat) if feat else (404, {"error": {"status": 404}})
+        m = re.fullmatch(r"playlists/([^/]+)/(?:tracks|items)", path)
+        if m and m.group(1) in self._playlist_ids:
+            start = self._playlist_ids[m.group(1)] * 37
+            items = [
+                {
+                    "added_at": "2025-01-01T00:00:00Z",
+                    "track": self.tracks[(start + j) % len(self.tracks)],
+                }
+                for j in range(self.tracks_per_playlist)
+            ]
+            return 200, self._page(url, items, params, default_limit=100)
+        return 404, {"error": {"status": 404, "message": "Service not found"}}
+
+    def _handler_class(self):
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body go out as separate writes; without TCP_NODELAY
+            # Nagle plus delayed ACKs add ~40ms to every response.
+            disable_nagle_algorithm = True
+
+            def log_message(self, fmt, *args):
+                logger.debug("fake api: " + fmt, *args)
+
+            def _send(self, status: int, body: bytes = b"", headers: Optional[Dict[str, str]] = None):
+                self.send_response(status)
+                for k, v in (headers or {}).items():
+                    self.send_header(k, v)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                if body:
+                    self.wfile.write(body)
+
+            def do_GET(self):
+                with api._stats_lock:
+                    api.stats["requests"] += 1
+                with api._rng_lock:
+                    delay = api.latency + api._rng.uniform(0, api.latency_jitter)
+                    throttled = api._rng.random() < api.throttle_rate
+                if delay > 0:
+                    time.sleep(delay)
+                if throttled:
+                    with api._stats_lock:
+                        api.stats["throttled"] += 1
+                    body = json.dumps({"error": {"status": 429, "message": "API rate limit exceeded"}})
+                    self._send(429, body.encode(), {
+                        "Content-Type": "application/json",
+                        "Retry-After": str(api.retry_after),
+                    })
+                    return
+
+                parts = urlsplit(self.path)
+                path = parts.path.split("/v1/", 1)[-1].strip("/")
+                params = {k: v[-1] for k, v in parse_qs(parts.query).items()}
+                status, payload = api.route(path, params)
+                body = json.dumps(payload).encode()
+                etag = '"%s"' % hashlib.md5(body).hexdigest()
+                if status == 200 and self.headers.get("If-None-Match") == etag:
+                    with api._stats_lock:
+                        api.stats["not_modified"] += 1
+                    self._send(304, headers={"ETag": etag})
+                    return
+                self._send(status, body, {"Content-Type": "application/json", "ETag": etag})
+
+        return Handler
+
+    # -- lifecycle -----------------------------------------------------------
+
+    def start(self) -> str:
+
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        logger.info("Fake Spotify API listening on %s", self.base_url)
+        return self.base_url
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "FakeSpotifyAPI":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s %(levelname)s ▶ %(message)s"
+    )
+    parser = argparse.ArgumentParser(description="Serve a local stand-in for the Spotify Web API")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--page_size", type=int, default=50)
+    parser.add_argument("--throttle_rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    api = FakeSpotifyAPI(
+        latency=args.latency, max_page_size=args.page_size,
+        throttle_rate=args.throttle_rate, port=args.port
+    )
+    api.start()
+    try:
+        api._thread.join()
+    except KeyboardInterrupt:
+        api.stop()
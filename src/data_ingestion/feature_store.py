@@ -0,0 +1,181 @@
+import json
+import sqlite3
+import threading
+import time
+import logging
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+import pandas as pd
+
+from src.preprocessing.utils import file_signature, iter_json_records, sha256_file
+
+
+logger = logging.getLogger(__name__)
+
+
+FEATURE_COLUMNS = {
+    "danceability": "REAL",
+    "energy": "REAL",
+    "key": "INTEGER",
+    "loudness": "REAL",
+    "mode": "INTEGER",
+    "speechiness": "REAL",
+    "acousticness": "REAL",
+    "instrumentalness": "REAL",
+    "liveness": "REAL",
+    "valence": "REAL",
+    "tempo": "REAL",
+    "duration_ms": "INTEGER",
+    "time_signature": "INTEGER",
+}
+
+
+class AudioFeatureStore:
+
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        cols = ",\n".join(f"{name} {kind}" for name, kind in FEATURE_COLUMNS.items())
+        self._conn.executescript(
+            f"""
+            CREATE TABLE IF NOT EXISTS audio_features (
+                track_id TEXT PRIMARY KEY,
+                {cols},
+                raw TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS imported_files (
+                name TEXT PRIMARY KEY,
+                signature TEXT NOT NULL,
+                sha256 TEXT NOT NULL
+            );
+            """
+        )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM audio_features").fetchone()[0]
+
+    def get_many(self, track_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+
+        ids = list(dict.fromkeys(track_ids))
+        found: Dict[str, Dict[str, Any]] = {}
+        with self._lock:
+            # Stay well below SQLite's bound-parameter limit.
+            for start in range(0, len(ids), 500):
+                chunk = ids[start:start + 500]
+                marks = ",".join("?" * len(chunk))
+                for tid, raw in self._conn.execute(
+                    f"SELECT track_id, raw FROM audio_features WHERE track_id IN ({marks})",
+                    chunk
+                ):
+                    found[tid] = json.loads(raw)
+        return found
+
+    def missing(self, track_ids: Iterable[str]) -> List[str]:
+
+        ids = list(dict.fromkeys(track_ids))
+        known = self.get_many(ids)
+        return [tid for tid in ids if tid not in known]
+
+    def upsert_many(self, features: Iterable[Dict[str, Any]]) -> int:
+
+        names = list(FEATURE_COLUMNS)
+        now = time.time()
+        rows = []
+        for feat in features:
+            tid = feat.get("id") or feat.get("track_id")
+            if not tid:
+                continue
+            rows.append(
+                [tid] + [feat.get(name) for name in names] + [json.dumps(feat), now]
+            )
+        if not rows:
+            return 0
+
+        cols = ["track_id"] + names + ["raw", "updated_at"]
+        updates = ", ".join(f"{c} = excluded.{c}" for c in cols[1:])
+        sql = (
+            f"INSERT INTO audio_features ({', '.join(cols)}) "
+            f"VALUES ({', '.join('?' * len(cols))}) "
+            f"ON CONFLICT(track_id) DO UPDATE SET {updates}"
+        )
+        with self._lock:
+            self._conn.executemany(sql, rows)
+            self._conn.commit()
+        logger.info("Upserted %d audio feature rows into %s", len(rows), self.path)
+        return len(rows)
+
+    def _mark_imported(self, name: str, signature: str, sha: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO imported_files (name, signature, sha256) VALUES (?, ?, ?)",
+                (name, signature, sha)
+            )
+            self._conn.commit()
+
+    def import_json_dir(self, raw_dir: Path, pattern: str = "audio_features_*") -> int:
+
+        # A snapshot is re-parsed only when its content differs from the last
+        # import. Digests are reused while size and mtime match, so a copied
+        # or restored file is re-hashed once but not re-imported.
+        with self._lock:
+            imported = {
+                name: (signature, sha) for name, signature, sha in
+                self._conn.execute("SELECT name, signature, sha256 FROM imported_files")
+            }
+
+        files = count = 0
+        for path in sorted(raw_dir.glob(pattern)):
+            signature = file_signature(path)
+            previous = imported.get(path.name)
+            if previous is not None and previous[0] == signature:
+                continue
+            sha = sha256_file(path)
+            if previous is None or previous[1] != sha:
+                count += self.upsert_many(iter_json_records(path.parent, pattern=path.name))
+                files += 1
+            self._mark_imported(path.name, signature, sha)
+        if files:
+            logger.info("Imported %d snapshot files (%d rows) into %s", files, count, self.path)
+        return count
+
+    def to_frame(self, columns: Optional[List[str]] = None) -> pd.DataFrame:
+
+        # Without a projection the stored payloads are returned whole (uri,
+        # track_href, analysis_url, type, ...), so a run served from the
+        # store has the same columns as one built from fresh snapshots.
+        unknown = set(columns or []) - set(FEATURE_COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown audio feature columns: {sorted(unknown)}")
+        if columns is None:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT track_id, raw FROM audio_features ORDER BY track_id"
+                ).fetchall()
+            df = pd.DataFrame([json.loads(raw) for _, raw in rows])
+            ids = [tid for tid, _ in rows]
+            if "id" in df.columns:
+                df = df.rename(columns={"id": "track_id"})
+                df["track_id"] = ids
+            else:
+                df.insert(0, "track_id", ids)
+            return df
+        cols = ["track_id"] + columns
+        with self._lock:
+            return pd.read_sql_query(
+                f"SELECT {', '.join(cols)} FROM audio_features ORDER BY track_id",
+                self._conn
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
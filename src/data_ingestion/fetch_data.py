@@ -1,13 +1,24 @@
 import os
+import sys
 import json
+import time
 import argparse
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from typing import Any
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 
-from spotify_client import SpotifyClient
+project_root = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(project_root))
+
+from src.data_ingestion.feature_store import AudioFeatureStore
+from src.data_ingestion.http_cache import ResponseCache
+from src.data_ingestion.spotify_client import SpotifyClient, PageIterator
+from src.data_ingestion.async_client import crawl_playlists
+from src.data_ingestion.recently_played_sync import HISTORY_FILE, sync_recently_played
+from src.preprocessing.utils import write_ndjson
 
 
 logging.basicConfig(
@@ -29,91 +40,276 @@ def save_json(data: Any, out_path: Path):
     logger.info("Saved JSON to %s", out_path)
 
 
+def payload_records(rtype: str, data: Any) -> Iterator[Any]:
+    
+    if rtype == "playlist_library":
+        for playlist_id, items in data.items():
+            for item in items:
+                yield dict(item, playlist_id=playlist_id)
+    elif isinstance(data, dict) and isinstance(data.get("items"), list):
+        yield from data["items"]
+    elif isinstance(data, list):
+        yield from data
+    else:
+        yield data
+
+
+def save_payload(rtype: str, data: Any, out_path: Path, fmt: str) -> Path:
+    
+    if fmt == "json":
+        save_json(data, out_path)
+        return out_path
+    out_path = out_path.with_name(out_path.stem + "." + fmt)
+    write_ndjson(payload_records(rtype, data), out_path)
+    return out_path
+
+
+def collect_pages(pager: PageIterator) -> Dict[str, Any]:
+    with pager:
+        total = pager.total
+        logger.info("Walking all pages (%d items expected)", total)
+        items = list(pager)
+    return {"items": items, "total": len(items)}
+
+
 def timestamp_str() -> str:
     return datetime.now().strftime("%Y%m%d_%H%M%S")
 
 
+RESOURCE_TYPES = [
+    "top_tracks", "top_artists", "recently_played", "audio_features",
+    "saved_tracks", "user_profile", "user_playlists", "playlist_tracks",
+    "playlist_library"
+]
+
+# Resources that need no extra arguments; what "--types all" fetches.
+ALL_TYPES = [
+    "user_profile", "top_tracks", "top_artists", "recently_played",
+    "saved_tracks", "user_playlists", "playlist_library"
+]
+
+
+def validate_job(rtype: str, opts: argparse.Namespace) -> None:
+    
+    # Argument problems, checked before any request is made.
+    if rtype not in RESOURCE_TYPES:
+        raise ValueError(f"Unsupported type: {rtype}")
+    if rtype == "playlist_tracks" and not getattr(opts, "playlist_id", None):
+        raise ValueError("--playlist_id is required for playlist_tracks")
+    if rtype == "audio_features" and not getattr(opts, "track_ids", None):
+        raise ValueError("--track_ids is required for audio_features")
+
+
+def fetch_resource(
+    client: SpotifyClient,
+    rtype: str,
+    opts: argparse.Namespace,
+    out_dir: Path,
+    now: str
+) -> Optional[Path]:
+    
+    if rtype in ("top_tracks", "top_artists"):
+        kind = "tracks" if rtype == "top_tracks" else "artists"
+        if opts.all_pages:
+            data = collect_pages(client.iter_user_top_items(
+                item_type=kind, time_range=opts.time_range, page_size=opts.limit
+            ))
+            fname = f"{rtype}_{opts.time_range}_all_{now}.json"
+        else:
+            data = client.get_user_top_items(
+                item_type=kind,
+                time_range=opts.time_range,
+                limit=opts.limit,
+                offset=opts.offset
+            )
+            fname = f"{rtype}_{opts.time_range}_{opts.limit}_{opts.offset}_{now}.json"
+
+    elif rtype == "recently_played":
+        if opts.incremental:
+            sync_recently_played(client, out_dir, limit=min(opts.limit, 50))
+            return out_dir / HISTORY_FILE
+        data = client.get_user_recently_played(limit=opts.limit)
+        fname = f"recently_played_{opts.limit}_{now}.json"
+
+    elif rtype == "saved_tracks":
+        if opts.all_pages:
+            data = collect_pages(client.iter_user_saved_tracks(page_size=opts.limit))
+            fname = f"saved_tracks_all_{now}.json"
+        else:
+            data = client.get_user_saved_tracks(
+                limit=opts.limit, offset=opts.offset
+            )
+            fname = f"saved_tracks_{opts.limit}_{opts.offset}_{now}.json"
+
+    elif rtype == "user_profile":
+        data = client.get_user_profile()
+        fname = f"user_profile_{now}.json"
+
+    elif rtype == "user_playlists":
+        if opts.all_pages:
+            data = collect_pages(client.iter_user_playlists(page_size=opts.limit))
+            fname = f"user_playlists_all_{now}.json"
+        else:
+            data = client.get_user_playlists(
+                limit=opts.limit, offset=opts.offset
+            )
+            fname = f"user_playlists_{opts.limit}_{opts.offset}_{now}.json"
+
+    elif rtype == "playlist_tracks":
+        if opts.all_pages:
+            data = collect_pages(client.iter_playlist_tracks(
+                opts.playlist_id, page_size=opts.limit
+            ))
+            fname = f"playlist_{opts.playlist_id}_all_{now}.json"
+        else:
+            data = client.get_playlist_tracks(
+                playlist_id=opts.playlist_id,
+                limit=opts.limit, offset=opts.offset
+            )
+            fname = f"playlist_{opts.playlist_id}_{opts.limit}_{opts.offset}_{now}.json"
+
+    elif rtype == "playlist_library":
+        data = crawl_playlists(
+            client.user_access_token(), api_base=client.api_base,
+            concurrency=opts.concurrency, scheduler=client.scheduler
+        )
+        fname = f"playlist_library_{now}.json"
+
+    elif rtype == "audio_features":
+        features, failures = client.fetch_audio_features(track_ids=opts.track_ids)
+        data = [feat for feat in features if feat is not None]
+        fname = f"audio_features_{len(opts.track_ids)}_{now}.json"
+        if failures:
+            save_json(failures, out_dir / f"failed_audio_features_{now}.json")
+
+    else:
+        raise ValueError(f"Unsupported type: {rtype}")
+
+    return save_payload(rtype, data, out_dir / fname, opts.format)
+
+
+def load_manifest(path: Path, defaults: argparse.Namespace) -> List[Tuple[str, argparse.Namespace]]:
+    
+    with path.open("r", encoding="utf-8") as f:
+        entries = json.load(f)
+    jobs = []
+    for entry in entries:
+        entry = dict(entry)
+        rtype = entry.pop("type")
+        if rtype not in RESOURCE_TYPES:
+            raise ValueError(f"Unsupported type in manifest {path}: {rtype}")
+        jobs.append((rtype, argparse.Namespace(**{**vars(defaults), **entry})))
+    return jobs
+
+
+def run_jobs(
+    client: SpotifyClient,
+    jobs: List[Tuple[str, argparse.Namespace]],
+    out_dir: Path,
+    now: str,
+    workers: int
+) -> List[Dict[str, Any]]:
+    
+    def run(rtype: str, opts: argparse.Namespace) -> Dict[str, Any]:
+        start = time.perf_counter()
+        try:
+            out_path = fetch_resource(client, rtype, opts, out_dir, now)
+            status, detail = "ok", str(out_path)
+        except Exception as e:
+            logger.error("Failed to fetch %s: %s", rtype, e, exc_info=True)
+            status, detail = "error", str(e)
+        return {
+            "type": rtype,
+            "status": status,
+            "seconds": round(time.perf_counter() - start, 3),
+            "detail": detail,
+        }
+
+    # One authenticated client serves every job; the scheduler keeps the
+    # combined request rate in check.
+    with ThreadPoolExecutor(max_workers=max(workers, 1)) as pool:
+        futures = [pool.submit(run, rtype, opts) for rtype, opts in jobs]
+        return [f.result() for f in futures]
+
+
+def log_summary(results: List[Dict[str, Any]], wall: float) -> None:
+    logger.info("Fetch summary (%.2fs wall):", wall)
+    for r in results:
+        logger.info(
+            "  %-18s %-5s %8.2fs  %s", r["type"], r["status"], r["seconds"], r["detail"]
+        )
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Fetch and save Spotify user data via the API"
     )
-    parser.add_argument(
-        "--type",
-        choices=[
-            "top_tracks", "top_artists", "recently_played", "audio_features",
-            "saved_tracks", "user_profile", "user_playlists", "playlist_tracks"
-        ],
-        required=True
-    )
+    mode = parser.add_mutually_exclusive_group(required=True)
+    mode.add_argument("--type", choices=RESOURCE_TYPES)
+    mode.add_argument("--types", nargs="+", choices=RESOURCE_TYPES + ["all"],
+                      metavar="TYPE",
+                      help="Fetch several resources in one run ('all' for every "
+                           "resource that needs no IDs)")
+    mode.add_argument("--manifest", type=Path,
+                      help="JSON list of {\"type\": ..., <option>: ...} jobs")
     parser.add_argument("--time_range",
                         choices=["short_term", "medium_term", "long_term"],
                         default="medium_term")
     parser.add_argument("--limit", type=int, default=50)
     parser.add_argument("--offset", type=int, default=0)
+    parser.add_argument("--all_pages", action="store_true",
+                        help="Walk every page (--limit is the page size) and save one file")
     parser.add_argument("--track_ids", nargs="+",
                         help="Space-separated list of track IDs for audio_features")
     parser.add_argument("--playlist_id",
                         help="Playlist ID when fetching playlist_tracks")
+    parser.add_argument("--concurrency", type=int, default=8,
+                        help="Max in-flight requests for playlist_library")
+    parser.add_argument("--workers", type=int, default=4,
+                        help="Resources fetched concurrently with --types/--manifest")
+    parser.add_argument("--format", choices=["json", "ndjson.gz", "ndjson.zst"],
+                        default="json",
+                        help="Raw payload format; NDJSON stores one record per line")
+    parser.add_argument("--no_cache", action="store_true",
+                        help="Bypass the on-disk HTTP response cache")
+    parser.add_argument("--incremental", action="store_true",
+                        help="recently_played: append only plays newer than the "
+                             "stored cursor to the history store")
     args = parser.parse_args()
 
-    base_dir = Path(__file__).resolve().parents[2]
-    out_dir = base_dir / "data" / "raw" / "spotify_api"
+    # Usage errors are reported here, before any work starts; failures
+    # while fetching propagate with their traceback.
+    try:
+        if args.manifest:
+            jobs = load_manifest(args.manifest, args)
+        elif args.types:
+            types = ALL_TYPES if "all" in args.types else args.types
+            jobs = [(rtype, args) for rtype in dict.fromkeys(types)]
+        else:
+            jobs = [(args.type, args)]
+        for rtype, opts in jobs:
+            validate_job(rtype, opts)
+    except ValueError as e:
+        parser.error(str(e))
+
+    out_dir = project_root / "data" / "raw" / "spotify_api"
     ensure_dir(out_dir)
 
-    client = SpotifyClient()
+    cache = None if args.no_cache else ResponseCache(out_dir / "http_cache.sqlite")
+    feature_store = AudioFeatureStore(out_dir / "audio_features.sqlite")
+    client = SpotifyClient(cache=cache, feature_store=feature_store)
     now = timestamp_str()
 
-    if args.type in ("top_tracks", "top_artists"):
-        kind = "tracks" if args.type == "top_tracks" else "artists"
-        data = client.get_user_top_items(
-            item_type=kind,
-            time_range=args.time_range,
-            limit=args.limit,
-            offset=args.offset
-        )
-        fname = f"{args.type}_{args.time_range}_{args.limit}_{args.offset}_{now}.json"
-
-    elif args.type == "recently_played":
-        data = client.get_user_recently_played(limit=args.limit)
-        fname = f"recently_played_{args.limit}_{now}.json"
-
-    elif args.type == "saved_tracks":
-        data = client.get_user_saved_tracks(
-            limit=args.limit, offset=args.offset
-        )
-        fname = f"saved_tracks_{args.limit}_{args.offset}_{now}.json"
-
-    elif args.type == "user_profile":
-        data = client.get_user_profile()
-        fname = f"user_profile_{now}.json"
-
-    elif args.type == "user_playlists":
-        data = client.get_user_playlists(
-            limit=args.limit, offset=args.offset
-        )
-        fname = f"user_playlists_{args.limit}_{args.offset}_{now}.json"
-
-    elif args.type == "playlist_tracks":
-        if not args.playlist_id:
-            parser.error("--playlist_id is required for playlist_tracks")
-        data = client.get_playlist_tracks(
-            playlist_id=args.playlist_id,
-            limit=args.limit, offset=args.offset
-        )
-        fname = f"playlist_{args.playlist_id}_{args.limit}_{args.offset}_{now}.json"
-
-    elif args.type == "audio_features":
-        if not args.track_ids:
-            parser.error("--track_ids is required for audio_features")
-        data = client.get_audio_features(track_ids=args.track_ids)
-        fname = f"audio_features_{len(args.track_ids)}_{now}.json"
-
+    if args.type:
+        fetch_resource(client, args.type, args, out_dir, now)
     else:
-        logger.error("Unsupported type: %s", args.type)
-        return
+        start = time.perf_counter()
+        results = run_jobs(client, jobs, out_dir, now, args.workers)
+        log_summary(results, time.perf_counter() - start)
 
-    out_path = out_dir / fname
-    save_json(data, out_path)
+    logger.info("Request stats: %s", client.scheduler.stats())
+    if cache is not None:
+        logger.info("HTTP cache: %s", client.session.counters)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,265 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import logging
+from pathlib import Path
+from typing import Any, Dict, Optional
+from urllib.parse import urlencode, urlsplit
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+
+logger = logging.getLogger(__name__)
+
+
+# Seconds a cached response is served without asking the API at all. After
+# that it is revalidated with If-None-Match. None bypasses the cache.
+# Keys are paths below /v1/; a trailing "/" makes a key a prefix match.
+DEFAULT_TTLS: Dict[str, Optional[float]] = {
+    "me": 24 * 3600,
+    "me/top/": 6 * 3600,
+    "me/tracks": 3600,
+    "me/playlists": 3600,
+    "playlists/": 3600,
+    "audio-features": 30 * 24 * 3600,
+    "audio-features/": 30 * 24 * 3600,
+    "me/player/recently-played": None,
+}
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+class ResponseCache:
+
+
+    def __init__(self, path: Path, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                etag TEXT,
+                headers TEXT NOT NULL,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                stored_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_responses_accessed
+                ON responses (accessed_at);
+            """
+        )
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT etag, headers, body, stored_at FROM responses WHERE key = ?",
+                (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE responses SET accessed_at = ? WHERE key = ?", (time.time(), key)
+            )
+            self._conn.commit()
+        etag, headers, body, stored_at = row
+        return {
+            "etag": etag,
+            "headers": json.loads(headers),
+            "body": body,
+            "stored_at": stored_at,
+        }
+
+    def put(self, key: str, etag: Optional[str], headers: Dict[str, str], body: bytes) -> None:
+
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(key, etag, headers, body, size, stored_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, etag, json.dumps(headers), body, len(body), now, now)
+            )
+            self._evict()
+            self._conn.commit()
+
+    def refresh(self, key: str) -> None:
+        """Mark an entry as freshly validated (after a 304)."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE responses SET stored_at = ?, accessed_at = ? WHERE key = ?",
+                (now, now, key)
+            )
+            self._conn.commit()
+
+    def total_bytes(self) -> int:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()[0]
+
+    def _evict(self) -> None:
+        total = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # Least recently used entries go first.
+        evicted = 0
+        for key, size in self._conn.execute(
+            "SELECT key, size FROM responses ORDER BY accessed_at"
+        ).fetchall():
+            if total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+            evicted += 1
+        logger.debug("Evicted %d cached responses", evicted)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def token_digest(auth: str) -> str:
+
+    return hashlib.sha256(auth.encode("utf-8")).hexdigest()[:16]
+
+
+def cache_key(
+    url: str,
+    params: Optional[Dict[str, Any]] = None,
+    scope: Optional[str] = None
+) -> str:
+
+    key = url
+    if params:
+        items = sorted((k, v) for k, v in params.items() if v is not None)
+        key = f"{url}?{urlencode(items)}"
+    return f"{scope} {key}" if scope else key
+
+
+class CachingSession(requests.Session):
+
+
+    def __init__(
+        self,
+        cache: ResponseCache,
+        ttls: Optional[Dict[str, Optional[float]]] = None,
+        client_id: Optional[str] = None
+    ):
+        super().__init__()
+        self.cache = cache
+        self.client_id = client_id or ""
+        # Bearer token digest -> stable cache scope, resolved once per token.
+        self._scopes: Dict[str, str] = {}
+        self._scope_lock = threading.Lock()
+        self.ttls = dict(DEFAULT_TTLS if ttls is None else ttls)
+        self._prefixes = sorted(
+            (k for k in self.ttls if k.endswith("/")), key=len, reverse=True
+        )
+        # run_jobs shares one session across a thread pool.
+        self.counters = {"hits": 0, "revalidated": 0, "misses": 0}
+        self._counter_lock = threading.Lock()
+
+    def _count(self, name: str) -> None:
+        with self._counter_lock:
+            self.counters[name] += 1
+
+    def scope_for(self, url: str, headers: Optional[Dict[str, str]]) -> Optional[str]:
+
+        # Entries are keyed by who is asking (client_id plus the user id from
+        # /me, or the app itself for client-credentials tokens), never by the
+        # token, so they survive the hourly refresh while one user's /me/*
+        # payloads are never served to another.
+        auth = CaseInsensitiveDict(headers or {}).get("Authorization")
+        if not auth:
+            return None
+        digest = token_digest(auth)
+        with self._scope_lock:
+            if digest in self._scopes:
+                return self._scopes[digest]
+            scope = self._resolve_scope(url, auth)
+            if scope is None:
+                # Identity unknown (e.g. /me failed): keep the entry private
+                # to this token rather than risk sharing it.
+                return f"token:{digest}"
+            self._scopes[digest] = scope
+            return scope
+
+    def _resolve_scope(self, url: str, auth: str) -> Optional[str]:
+        if "/v1/" not in url:
+            return None
+        me_url = url[:url.index("/v1/") + len("/v1/")] + "me"
+        try:
+            resp = super().request("GET", me_url, headers={"Authorization": auth}, timeout=10)
+        except requests.RequestException as e:
+            logger.debug("Could not resolve cache scope: %s", e)
+            return None
+        if resp.status_code == 200:
+            user_id = resp.json().get("id")
+            return f"{self.client_id}:user:{user_id}" if user_id else None
+        if resp.status_code in (401, 403):
+            # Client-credentials tokens have no user; they share the app scope.
+            return f"{self.client_id}:app"
+        return None
+
+    def ttl_for(self, url: str) -> Optional[float]:
+
+        path = urlsplit(url).path
+        path = path.split("/v1/", 1)[-1].strip("/")
+        if path in self.ttls:
+            return self.ttls[path]
+        for prefix in self._prefixes:
+            if path.startswith(prefix):
+                return self.ttls[prefix]
+        return None
+
+    def _from_cache(self, entry: Dict[str, Any], url: str) -> requests.Response:
+        resp = requests.Response()
+        resp.status_code = 200
+        resp.reason = "OK"
+        resp.url = url
+        resp.headers = CaseInsensitiveDict(entry["headers"])
+        resp._content = entry["body"]
+        resp.encoding = "utf-8"
+        return resp
+
+    def request(self, method, url, params=None, headers=None, **kwargs):
+        ttl = self.ttl_for(url) if method.upper() == "GET" else None
+        if ttl is None:
+            return super().request(method, url, params=params, headers=headers, **kwargs)
+
+        key = cache_key(url, params, scope=self.scope_for(url, headers))
+        entry = self.cache.get(key)
+        if entry is not None and time.time() - entry["stored_at"] < ttl:
+            self._count("hits")
+            return self._from_cache(entry, url)
+
+        headers = dict(headers or {})
+        if entry is not None and entry["etag"]:
+            headers["If-None-Match"] = entry["etag"]
+        resp = super().request(method, url, params=params, headers=headers, **kwargs)
+
+        if resp.status_code == 304 and entry is not None:
+            self._count("revalidated")
+            self.cache.refresh(key)
+            return self._from_cache(entry, url)
+
+        self._count("misses")
+        if resp.status_code == 200:
+            kept = {
+                k: v for k, v in resp.headers.items()
+                if k.lower() in ("content-type", "etag")
+            }
+            self.cache.put(key, resp.headers.get("ETag"), kept, resp.content)
+        return resp
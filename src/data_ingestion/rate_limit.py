@@ -0,0 +1,244 @@
+import asyncio
+import random
+import threading
+import time
+import logging
+from typing import Any, Callable, Dict, Optional
+
+
+logger = logging.getLogger(__name__)
+
+
+RETRYABLE_STATUSES = (429, 500, 502, 503, 504)
+
+
+def status_of(exc: Exception) -> Optional[int]:
+
+    # spotipy.SpotifyException, requests.HTTPError and aiohttp errors each
+    # carry the status in a different place.
+    status = getattr(exc, "http_status", None) or getattr(exc, "status", None)
+    if status is None:
+        response = getattr(exc, "response", None)
+        status = getattr(response, "status_code", None)
+    try:
+        return int(status) if status is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def retry_after_of(exc: Exception) -> Optional[float]:
+
+    headers = getattr(exc, "headers", None)
+    if headers is None:
+        headers = getattr(getattr(exc, "response", None), "headers", None)
+    if not headers:
+        return None
+    value = headers.get("Retry-After") or headers.get("retry-after")
+    try:
+        return max(float(value), 0.0) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+
+
+    def __init__(self, rate: float, capacity: float):
+        if rate <= 0 or capacity <= 0:
+            raise ValueError("rate and capacity must be positive")
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take one token and return how long the caller must wait for it."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.capacity, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+
+class RequestScheduler:
+
+
+    def __init__(
+        self,
+        rate: float = 10.0,
+        burst: int = 20,
+        initial_concurrency: int = 4,
+        min_concurrency: int = 1,
+        max_concurrency: int = 16,
+        max_retries: int = 5,
+        base_delay: float = 0.5,
+        max_delay: float = 30.0
+    ):
+        if not min_concurrency <= initial_concurrency <= max_concurrency:
+            raise ValueError("initial_concurrency must lie within [min, max]")
+        self.bucket = TokenBucket(rate, burst)
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+        self._limit = float(initial_concurrency)
+        self._in_flight = 0
+        self._blocked_until = 0.0
+        self._cond = threading.Condition()
+        self._counters: Dict[str, float] = {
+            "requests": 0,
+            "successes": 0,
+            "failures": 0,
+            "retries": 0,
+            "throttled_responses": 0,
+            "throttled_seconds": 0.0,
+            "backoff_seconds": 0.0,
+        }
+
+    @property
+    def concurrency_limit(self) -> int:
+        with self._cond:
+            return int(self._limit)
+
+    def stats(self) -> Dict[str, float]:
+
+        with self._cond:
+            stats = dict(self._counters)
+            stats["concurrency_limit"] = int(self._limit)
+        return stats
+
+    def _count(self, key: str, amount: float = 1) -> None:
+        with self._cond:
+            self._counters[key] += amount
+
+    def _try_enter(self) -> float:
+        """Claim a concurrency slot, or return how long to wait before retrying."""
+        with self._cond:
+            paused = self._blocked_until - time.monotonic()
+            if paused > 0:
+                return paused
+            if self._in_flight >= int(self._limit):
+                return -1.0
+            self._in_flight += 1
+            self._counters["requests"] += 1
+            return 0.0
+
+    def _enter(self) -> None:
+        while True:
+            wait = self._try_enter()
+            if wait == 0.0:
+                break
+            if wait > 0:
+                self._count("throttled_seconds", wait)
+                time.sleep(wait)
+            else:
+                with self._cond:
+                    self._cond.wait(timeout=0.1)
+        delay = self.bucket.reserve()
+        if delay > 0:
+            self._count("throttled_seconds", delay)
+            time.sleep(delay)
+
+    async def _aenter(self) -> None:
+        while True:
+            wait = self._try_enter()
+            if wait == 0.0:
+                break
+            if wait > 0:
+                self._count("throttled_seconds", wait)
+            await asyncio.sleep(wait if wait > 0 else 0.01)
+        delay = self.bucket.reserve()
+        if delay > 0:
+            self._count("throttled_seconds", delay)
+            await asyncio.sleep(delay)
+
+    def _exit(self, status: Optional[int], retry_after: Optional[float]) -> None:
+        with self._cond:
+            self._in_flight -= 1
+            if status == 429:
+                # Multiplicative decrease, and everyone waits out Retry-After.
+                self._counters["throttled_responses"] += 1
+                self._limit = max(float(self.min_concurrency), self._limit / 2)
+                if retry_after:
+                    self._blocked_until = max(
+                        self._blocked_until, time.monotonic() + retry_after
+                    )
+                logger.warning(
+                    "Throttled (429); concurrency limit now %d, retry after %s",
+                    int(self._limit), retry_after
+                )
+            elif status is None:
+                # Additive increase: roughly +1 slot per window of successes.
+                self._limit = min(
+                    float(self.max_concurrency), self._limit + 1.0 / self._limit
+                )
+            self._cond.notify_all()
+
+    def _retry_delay(self, exc: Exception, attempt: int) -> Optional[float]:
+        """Seconds to back off before retrying, or None if exc is not retryable."""
+        status = status_of(exc)
+        if status is None and not isinstance(exc, (OSError, TimeoutError)):
+            return None
+        if status is not None and status not in RETRYABLE_STATUSES:
+            return None
+        if attempt >= self.max_retries:
+            return None
+        if status == 429 and retry_after_of(exc) is not None:
+            # The global pause already covers Retry-After; add a little jitter.
+            return random.uniform(0, self.base_delay)
+        # Full jitter exponential backoff.
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def call(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+
+        attempt = 0
+        while True:
+            self._enter()
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as exc:
+                self._exit(status_of(exc) or -1, retry_after_of(exc))
+                delay = self._retry_delay(exc, attempt)
+                if delay is None:
+                    self._count("failures")
+                    raise
+                attempt += 1
+                self._count("retries")
+                self._count("backoff_seconds", delay)
+                logger.info("Retrying after %s (attempt %d, %.2fs)", exc, attempt, delay)
+                time.sleep(delay)
+                continue
+            self._exit(None, None)
+            self._count("successes")
+            return result
+
+    async def acall(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+
+        attempt = 0
+        while True:
+            await self._aenter()
+            try:
+                result = await fn(*args, **kwargs)
+            except Exception as exc:
+                self._exit(status_of(exc) or -1, retry_after_of(exc))
+                delay = self._retry_delay(exc, attempt)
+                if delay is None:
+                    self._count("failures")
+                    raise
+                attempt += 1
+                self._count("retries")
+                self._count("backoff_seconds", delay)
+                logger.info("Retrying after %s (attempt %d, %.2fs)", exc, attempt, delay)
+                await asyncio.sleep(delay)
+                continue
+            self._exit(None, None)
+            self._count("successes")
+            return result
@@ -0,0 +1,96 @@
+import json
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from src.preprocessing.utils import iter_json_records, read_json_lines, write_ndjson
+
+
+logger = logging.getLogger(__name__)
+
+
+HISTORY_FILE = "recently_played_history.jsonl"
+CURSOR_FILE = "recently_played_cursor.json"
+
+
+def played_at_ms(played_at: str) -> int:
+
+    ts = datetime.fromisoformat(played_at.replace("Z", "+00:00"))
+    return int(ts.timestamp() * 1000)
+
+
+def load_cursor(out_dir: Path) -> Optional[int]:
+
+    path = out_dir / CURSOR_FILE
+    if not path.exists():
+        return None
+    with path.open("r", encoding="utf-8") as f:
+        return json.load(f).get("after")
+
+
+def save_cursor(out_dir: Path, cursor: int) -> None:
+
+    with (out_dir / CURSOR_FILE).open("w", encoding="utf-8") as f:
+        json.dump({"after": cursor}, f)
+
+
+def sync_recently_played(client, out_dir: Path, limit: int = 50) -> int:
+
+    cursor = load_cursor(out_dir)
+    logger.info("Syncing recently played after cursor %s", cursor)
+
+    new_items: Dict[int, Dict[str, Any]] = {}
+    after = cursor
+    while True:
+        page = client.get_user_recently_played(limit=limit, after=after)
+        items = page.get("items", [])
+        fresh = {
+            played_at_ms(it["played_at"]): it for it in items
+            if cursor is None or played_at_ms(it["played_at"]) > cursor
+        }
+        fresh = {k: v for k, v in fresh.items() if k not in new_items}
+        if not fresh:
+            break
+        new_items.update(fresh)
+        newest = max(fresh)
+        if len(items) < limit or newest == after:
+            break
+        after = newest
+
+    if not new_items:
+        logger.info("No new plays since last sync")
+        return 0
+
+    # Append oldest first so the history file stays in play order.
+    write_ndjson(
+        (new_items[key] for key in sorted(new_items)),
+        out_dir / HISTORY_FILE, append=True
+    )
+    save_cursor(out_dir, max(new_items))
+    logger.info("Appended %d new plays to %s", len(new_items), HISTORY_FILE)
+    return len(new_items)
+
+
+def iter_play_history(
+    raw_dir: Path,
+    pattern: str = "recently_played_*"
+) -> Iterator[Dict[str, Any]]:
+
+    # Snapshot files overlap each other and the history store; each play is
+    # identified by its played_at timestamp and yielded once.
+    seen = set()
+    sources: List[Iterator[Dict[str, Any]]] = []
+    history = raw_dir / HISTORY_FILE
+    if history.exists():
+        sources.append(read_json_lines(history))
+    sources.append(iter_json_records(
+        raw_dir, pattern=pattern, exclude=(HISTORY_FILE, CURSOR_FILE)
+    ))
+    for source in sources:
+        for item in source:
+            played_at = item.get("played_at")
+            if played_at is None or played_at in seen:
+                continue
+            seen.add(played_at)
+            yield item
@@ -1,12 +1,20 @@
 import os
 import time
 import logging
-from typing import List, Dict, Any, Optional
+import weakref
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple, Callable, Iterator
 
+import requests
+from requests.adapters import HTTPAdapter
 from spotipy import Spotify
 from spotipy.oauth2 import SpotifyOAuth, SpotifyClientCredentials
 from spotipy.exceptions import SpotifyException
 
+from src.data_ingestion.feature_store import AudioFeatureStore
+from src.data_ingestion.http_cache import CachingSession, ResponseCache
+from src.data_ingestion.rate_limit import RequestScheduler
+
 
 logging.basicConfig(
     level=logging.INFO,
@@ -15,6 +23,128 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+API_BASE = "https://api.spotify.com/v1/"
+AUDIO_FEATURES_BATCH_SIZE = 100
+
+
+def build_session(
+    pool_size: int = 10,
+    cache: Optional[ResponseCache] = None,
+    client_id: Optional[str] = None
+) -> requests.Session:
+    
+    session = (
+        CachingSession(cache, client_id=client_id) if cache is not None
+        else requests.Session()
+    )
+    # No transport-level retries: RequestScheduler owns retry and backoff.
+    adapter = HTTPAdapter(
+        pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+class PageIterator:
+    
+
+    def __init__(
+        self,
+        fetch_page: Callable[[int, int], Dict[str, Any]],
+        page_size: int,
+        offset: int = 0,
+        max_items: Optional[int] = None,
+        prefetch: bool = True
+    ):
+        self._fetch_page = fetch_page
+        self.page_size = page_size
+        self.offset = offset
+        self.max_items = max_items
+        self.prefetch = prefetch
+        self._first_page: Optional[Dict[str, Any]] = None
+        self._generators: "weakref.WeakSet" = weakref.WeakSet()
+
+    @property
+    def total(self) -> int:
+        """Number of items this iterator will yield (fetches page one if needed)."""
+        if self._first_page is None:
+            self._first_page = self._fetch_page(self.page_size, self.offset)
+        available = max(int(self._first_page.get("total") or 0) - self.offset, 0)
+        if self.max_items is not None:
+            return min(available, self.max_items)
+        return available
+
+    def _has_more(self, page: Dict[str, Any], next_offset: int) -> bool:
+        if not page.get("items") or not page.get("next"):
+            return False
+        if self.max_items is not None and next_offset - self.offset >= self.max_items:
+            return False
+        total = page.get("total")
+        return total is None or next_offset < total
+
+    def pages(self) -> Iterator[Dict[str, Any]]:
+        
+        gen = self._pages()
+        self._generators.add(gen)
+        return gen
+
+    def _pages(self) -> Iterator[Dict[str, Any]]:
+        page = self._first_page or self._fetch_page(self.page_size, self.offset)
+        self._first_page = page
+        # Offsets advance by the items actually returned, since the server
+        # may cap the page size below the one requested.
+        next_offset = self.offset + len(page.get("items") or [])
+
+        # A single worker keeps page N+1 in flight while the caller handles N.
+        pool = ThreadPoolExecutor(max_workers=1) if self.prefetch else None
+        upcoming = None
+        try:
+            while True:
+                upcoming = None
+                if self._has_more(page, next_offset):
+                    if pool is not None:
+                        upcoming = pool.submit(self._fetch_page, self.page_size, next_offset)
+                    else:
+                        upcoming = next_offset
+                yield page
+                if upcoming is None:
+                    return
+                page = (
+                    upcoming.result() if pool is not None
+                    else self._fetch_page(self.page_size, upcoming)
+                )
+                next_offset += len(page.get("items") or [])
+        finally:
+            # On an early break, an error or close(), the prefetched page is
+            # abandoned rather than waited for.
+            if isinstance(upcoming, Future):
+                upcoming.cancel()
+            if pool is not None:
+                pool.shutdown(wait=False, cancel_futures=True)
+
+    def close(self) -> None:
+        
+        for gen in list(self._generators):
+            gen.close()
+
+    def __enter__(self) -> "PageIterator":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        remaining = self.max_items
+        for page in self.pages():
+            for item in page.get("items", []):
+                if remaining is not None:
+                    if remaining <= 0:
+                        return
+                    remaining -= 1
+                yield item
+
+
 class SpotifyClient:
     
 
@@ -26,38 +156,71 @@ class SpotifyClient:
         scope: str = (
             "user-top-read user-read-recently-played "
             "user-library-read playlist-read-private"
-        )
+        ),
+        scheduler: Optional[RequestScheduler] = None,
+        cache: Optional[ResponseCache] = None,
+        api_base: str = API_BASE,
+        access_token: Optional[str] = None,
+        feature_store: Optional[AudioFeatureStore] = None
     ):
         self.client_id = client_id or os.getenv("SPOTIPY_CLIENT_ID")
         self.client_secret = client_secret or os.getenv("SPOTIPY_CLIENT_SECRET")
         self.redirect_uri = redirect_uri or os.getenv("SPOTIPY_REDIRECT_URI")
         self.scope = scope
+        self.scheduler = scheduler or RequestScheduler()
+        self.api_base = api_base if api_base.endswith("/") else api_base + "/"
+        self.access_token = access_token
+        self.feature_store = feature_store
 
-        if not all([self.client_id, self.client_secret, self.redirect_uri]):
-            raise ValueError("Must set SPOTIPY_CLIENT_ID, CLIENT_SECRET, and REDIRECT_URI")
-
-        auth_manager = SpotifyOAuth(
-            client_id=self.client_id,
-            client_secret=self.client_secret,
-            redirect_uri=self.redirect_uri,
-            scope=self.scope,
-            cache_path=".spotify_token_cache"
+        # One keep-alive pool shared by both spotipy clients and the raw
+        # audio-features calls, so repeated requests reuse connections.
+        self.session = build_session(
+            pool_size=self.scheduler.max_concurrency, cache=cache, client_id=self.client_id
         )
 
-        self.sp = Spotify(auth_manager=auth_manager)
+        if access_token is not None:
+            # A fixed bearer token (e.g. for a local stand-in API) skips OAuth.
+            self.sp = Spotify(auth=access_token, requests_session=self.session)
+            self.sp_client = self.sp
+        else:
+            if not all([self.client_id, self.client_secret, self.redirect_uri]):
+                raise ValueError("Must set SPOTIPY_CLIENT_ID, CLIENT_SECRET, and REDIRECT_URI")
 
-        cc_manager = SpotifyClientCredentials(
-            client_id=self.client_id,
-            client_secret=self.client_secret
-        )
-        self.sp_client = Spotify(client_credentials_manager=cc_manager)
+            auth_manager = SpotifyOAuth(
+                client_id=self.client_id,
+                client_secret=self.client_secret,
+                redirect_uri=self.redirect_uri,
+                scope=self.scope,
+                cache_path=".spotify_token_cache"
+            )
+            self.sp = Spotify(auth_manager=auth_manager, requests_session=self.session)
 
+            cc_manager = SpotifyClientCredentials(
+                client_id=self.client_id,
+                client_secret=self.client_secret
+            )
+            self.sp_client = Spotify(
+                client_credentials_manager=cc_manager, requests_session=self.session
+            )
+
+        self.sp.prefix = self.api_base
+        self.sp_client.prefix = self.api_base
         logger.info("Authenticated to Spotify with scope=%s", self.scope)
 
+    def user_access_token(self) -> str:
+        
+        if self.access_token is not None:
+            return self.access_token
+        return self.sp.auth_manager.get_access_token(as_dict=False)
+
     def get_user_profile(self) -> Dict[str, Any]:
         """Fetch current user’s profile (display name, country, followers, etc.)."""
         logger.info("Fetching user profile")
-        return self.sp.current_user()
+        try:
+            return self.scheduler.call(self.sp.current_user)
+        except SpotifyException as e:
+            logger.error("Error fetching user profile: %s", e, exc_info=True)
+            raise
 
     def get_user_top_items(
         self,
@@ -74,7 +237,9 @@ class SpotifyClient:
         )
         try:
             method = getattr(self.sp, f"current_user_top_{item_type}")
-            return method(time_range=time_range, limit=limit, offset=offset)
+            return self.scheduler.call(
+                method, time_range=time_range, limit=limit, offset=offset
+            )
         except SpotifyException as e:
             logger.error("Error fetching top %s: %s", item_type, e, exc_info=True)
             raise
@@ -89,7 +254,8 @@ class SpotifyClient:
         logger.info("Fetching recently played (limit=%d, after=%s, before=%s)",
                     limit, after, before)
         try:
-            return self.sp.current_user_recently_played(
+            return self.scheduler.call(
+                self.sp.current_user_recently_played,
                 limit=limit, after=after, before=before
             )
         except SpotifyException as e:
@@ -104,7 +270,9 @@ class SpotifyClient:
         
         logger.info("Fetching saved tracks (limit=%d, offset=%d)", limit, offset)
         try:
-            return self.sp.current_user_saved_tracks(limit=limit, offset=offset)
+            return self.scheduler.call(
+                self.sp.current_user_saved_tracks, limit=limit, offset=offset
+            )
         except SpotifyException as e:
             logger.error("Error fetching saved tracks: %s", e, exc_info=True)
             raise
@@ -117,7 +285,9 @@ class SpotifyClient:
         
         logger.info("Fetching user playlists (limit=%d, offset=%d)", limit, offset)
         try:
-            return self.sp.current_user_playlists(limit=limit, offset=offset)
+            return self.scheduler.call(
+                self.sp.current_user_playlists, limit=limit, offset=offset
+            )
         except SpotifyException as e:
             logger.error("Error fetching playlists: %s", e, exc_info=True)
             raise
@@ -134,30 +304,153 @@ class SpotifyClient:
             playlist_id, limit, offset
         )
         try:
-            return self.sp.playlist_items(playlist_id, limit=limit, offset=offset)
+            return self.scheduler.call(
+                self.sp.playlist_items, playlist_id, limit=limit, offset=offset
+            )
         except SpotifyException as e:
             logger.error("Error fetching playlist %s: %s", playlist_id, e, exc_info=True)
             raise
 
-    def get_audio_features(self, track_ids: List[str]) -> List[Dict[str, Any]]:
-        import requests
+    def iter_user_top_items(
+        self,
+        item_type: str = "tracks",
+        time_range: str = "medium_term",
+        page_size: int = 50,
+        max_items: Optional[int] = None,
+        prefetch: bool = True
+    ) -> PageIterator:
+        
+        return PageIterator(
+            lambda limit, offset: self.get_user_top_items(
+                item_type=item_type, time_range=time_range,
+                limit=limit, offset=offset
+            ),
+            page_size=page_size, max_items=max_items, prefetch=prefetch
+        )
 
+    def iter_user_saved_tracks(
+        self,
+        page_size: int = 50,
+        max_items: Optional[int] = None,
+        prefetch: bool = True
+    ) -> PageIterator:
+        
+        return PageIterator(
+            self.get_user_saved_tracks,
+            page_size=page_size, max_items=max_items, prefetch=prefetch
+        )
+
+    def iter_user_playlists(
+        self,
+        page_size: int = 50,
+        max_items: Optional[int] = None,
+        prefetch: bool = True
+    ) -> PageIterator:
+        
+        return PageIterator(
+            self.get_user_playlists,
+            page_size=page_size, max_items=max_items, prefetch=prefetch
+        )
+
+    def iter_playlist_tracks(
+        self,
+        playlist_id: str,
+        page_size: int = 100,
+        max_items: Optional[int] = None,
+        prefetch: bool = True
+    ) -> PageIterator:
+        
+        return PageIterator(
+            lambda limit, offset: self.get_playlist_tracks(
+                playlist_id, limit=limit, offset=offset
+            ),
+            page_size=page_size, max_items=max_items, prefetch=prefetch
+        )
+
+    def _client_access_token(self) -> str:
+        if self.access_token is not None:
+            return self.access_token
         try:
             tokinfo = self.sp_client._auth_manager.get_cached_token()
-            access_token = tokinfo["access_token"]
+            return tokinfo["access_token"]
         except Exception:
             
-            access_token = self.sp_client._auth_manager.get_access_token(as_dict=False)
-        headers = {"Authorization": f"Bearer {access_token}"}
+            return self.sp_client._auth_manager.get_access_token(as_dict=False)
+
+    def fetch_audio_features(
+        self,
+        track_ids: List[str],
+        batch_size: int = AUDIO_FEATURES_BATCH_SIZE
+    ) -> Tuple[List[Optional[Dict[str, Any]]], Dict[str, str]]:
+        
+        if not 1 <= batch_size <= AUDIO_FEATURES_BATCH_SIZE:
+            raise ValueError(
+                f"batch_size must be between 1 and {AUDIO_FEATURES_BATCH_SIZE}"
+            )
+
+        headers = {"Authorization": f"Bearer {self._client_access_token()}"}
+        url = f"{self.api_base}audio-features"
+
+        def get_batch(ids: List[str]) -> List[Optional[Dict[str, Any]]]:
+            resp = self.session.get(url, headers=headers, params={"ids": ",".join(ids)})
+            resp.raise_for_status()
+            return resp.json().get("audio_features") or []
+
+        # Tracks already in the feature store are never requested again.
+        known = self.feature_store.get_many(track_ids) if self.feature_store else {}
+        pending = [tid for tid in dict.fromkeys(track_ids) if tid not in known]
+        if known:
+            logger.info(
+                "%d of %d tracks found in feature store; requesting %d",
+                len(known), len(track_ids), len(pending)
+            )
 
-        features: List[Dict[str, Any]] = []
-        for tid in track_ids:
-            url = f"https://api.spotify.com/v1/audio-features/{tid}"
+        fetched: Dict[str, Dict[str, Any]] = {}
+        failures: Dict[str, str] = {}
+        for start in range(0, len(pending), batch_size):
+            batch = pending[start:start + batch_size]
+            logger.info(
+                "Fetching audio features %d-%d of %d",
+                start + 1, start + len(batch), len(pending)
+            )
             try:
-                resp = requests.get(url, headers=headers)
-                resp.raise_for_status()
-                feat = resp.json()
-                features.append(feat)
+                batch_features = self.scheduler.call(get_batch, batch)
             except Exception as e:
-                logger.warning("Failed to fetch audio_features for %s: %s", tid, e)
-        return features
\ No newline at end of file
+                logger.warning(
+                    "Failed to fetch audio_features batch at %d: %s", start, e
+                )
+                for tid in batch:
+                    failures[tid] = str(e)
+                continue
+
+            # The endpoint answers positionally, with null for unknown IDs.
+            for pos, tid in enumerate(batch):
+                feat = batch_features[pos] if pos < len(batch_features) else None
+                if feat is None:
+                    failures[tid] = "no audio features returned"
+                else:
+                    fetched[tid] = feat
+
+        if self.feature_store is not None and fetched:
+            self.feature_store.upsert_many(fetched.values())
+
+        features: List[Optional[Dict[str, Any]]] = [
+            known.get(tid) or fetched.get(tid) for tid in track_ids
+        ]
+        if failures:
+            logger.warning(
+                "Audio features missing for %d of %d tracks",
+                len(failures), len(track_ids)
+            )
+        return features, failures
+
+    def get_audio_features(
+        self,
+        track_ids: List[str],
+        batch_size: int = AUDIO_FEATURES_BATCH_SIZE
+    ) -> List[Dict[str, Any]]:
+        
+        features, failures = self.fetch_audio_features(track_ids, batch_size)
+        for tid, reason in failures.items():
+            logger.warning("Failed to fetch audio_features for %s: %s", tid, reason)
+        return [feat for feat in features if feat is not None]
@@ -1,10 +1,18 @@
+import argparse
+import json
 import logging
 from pathlib import Path
 import numpy as np
 import pandas as pd
+from typing import Any, Dict, List, Optional
 
+from src.features.scaler import RunningScaler
 from src.preprocessing.utils import (
     get_project_root,
+    count_io,
+    ensure_dir,
+    file_signature,
+    append_df_csv,
     read_df_csv,
     save_df_csv
 )
@@ -12,6 +20,14 @@ from src.preprocessing.utils import (
 logger = logging.getLogger(__name__)
 
 
+SCALER_PATH = Path("models") / "audio_feature_scaler.json"
+
+KEY_COLUMN = "track_id"
+
+STATE_FILE = "state.json"
+HASH_FILE = "row_hashes.csv"
+
+
 def load_audio_features(interim_path: Path) -> pd.DataFrame:
     
     logger.info("Loading audio features from %s", interim_path)
@@ -41,32 +57,163 @@ def engineer_audio_features(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
+def numeric_columns(df: pd.DataFrame, exclude: list = None) -> list:
+    
+    exclude = exclude or []
+    num_cols = df.select_dtypes(include=[np.number]).columns.tolist()
+    return [c for c in num_cols if c not in exclude]
+
+
 def normalize_numeric(
     df: pd.DataFrame,
-    exclude: list = None
+    exclude: list = None,
+    scaler: Optional[RunningScaler] = None
 ) -> pd.DataFrame:
     
-    exclude = exclude or []
-    df = df.copy()
+    # Without a scaler the statistics are fitted on df; a fitted scaler
+    # (e.g. RunningScaler.load(SCALER_PATH)) z-scores df against the stored
+    # statistics instead, in O(len(df)).
+    if scaler is None:
+        scaler = RunningScaler().fit(df, numeric_columns(df, exclude))
     
+    df = pd.concat([df, scaler.transform(df)], axis=1)
+    logger.info("Created %d normalized columns", len(scaler.columns))
+    return df
+
+
+def row_hashes(df: pd.DataFrame) -> pd.Series:
     
-    num_cols = df.select_dtypes(include=[np.number]).columns.tolist()
-    to_norm = [c for c in num_cols if c not in exclude]
+    # One 64-bit hash of every input column per row, indexed by track_id.
+    hashes = pd.util.hash_pandas_object(df, index=False).to_numpy().view("int64")
+    return pd.Series(hashes, index=df[KEY_COLUMN].astype(str).to_numpy(), name="row_hash")
+
+
+def load_state(state_dir: Path) -> Dict[str, Any]:
     
-    for col in to_norm:
-        mean = df[col].mean()
-        std = df[col].std()
-        if std > 0:
-            df[f"{col}_z"] = (df[col] - mean) / std
-        else:
-            df[f"{col}_z"] = 0.0
-        logger.debug("Normalized %s: mean=%.3f std=%.3f", col, mean, std)
+    state_path = state_dir / STATE_FILE
+    if not state_path.exists():
+        return {}
+    with state_path.open("r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_state(state_dir: Path, state: Dict[str, Any], hashes: pd.Series) -> None:
     
-    logger.info("Created %d normalized columns", len(to_norm))
-    return df
+    state_path = state_dir / STATE_FILE
+    ensure_dir(state_path)
+    save_df_csv(
+        pd.DataFrame({KEY_COLUMN: hashes.index, "row_hash": hashes.to_numpy()}),
+        state_dir / HASH_FILE
+    )
+    with state_path.open("w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2)
+
+
+def load_previous(
+    out_path: Path,
+    scaler_path: Path,
+    state_dir: Path,
+    input_columns: List[str]
+) -> Optional[Dict[str, Any]]:
+    
+    # The previous run is reusable only if its output and scaler are still
+    # the files it wrote and the input columns have not changed.
+    state = load_state(state_dir)
+    if not state or not (state_dir / HASH_FILE).exists():
+        return None
+    if not out_path.exists() or not scaler_path.exists():
+        return None
+    if state.get("input_columns") != input_columns:
+        return None
+    if state.get("output") != file_signature(out_path) or state.get("scaler") != file_signature(scaler_path):
+        return None
+
+    hashes = read_df_csv(state_dir / HASH_FILE)
+    return {
+        "state": state,
+        "hashes": pd.Series(
+            hashes["row_hash"].to_numpy(dtype="int64"),
+            index=hashes[KEY_COLUMN].astype(str).to_numpy()
+        ),
+        "scaler": RunningScaler.load(scaler_path),
+        "output": read_df_csv(out_path),
+    }
+
+
+def build_audio_features(
+    df_raw: pd.DataFrame,
+    out_path: Path,
+    scaler_path: Path,
+    state_dir: Path,
+    full: bool = False
+) -> pd.DataFrame:
+    
+    input_columns = list(df_raw.columns)
+    hashes = row_hashes(df_raw)
+    previous = None
+    if not full and hashes.index.is_unique:
+        previous = load_previous(out_path, scaler_path, state_dir, input_columns)
+
+    if previous is None:
+        df_feat = engineer_audio_features(df_raw)
+        scaler = RunningScaler().fit(df_feat, numeric_columns(df_feat, exclude=[KEY_COLUMN]))
+        df_out = normalize_numeric(df_feat, scaler=scaler)
+        save_df_csv(df_out, out_path)
+        logger.info("Engineered features for all %d tracks", len(df_out))
+    else:
+        # A row is reused when its track_id is known and its input hash is
+        # unchanged; everything else from the previous run is stale.
+        prev_hashes = previous["hashes"]
+        unchanged = prev_hashes.reindex(hashes.index).to_numpy() == hashes.to_numpy()
+        kept = hashes.index[unchanged]
+        stale = prev_hashes.index.difference(kept)
+        if unchanged.all() and stale.empty:
+            logger.info("No new or changed tracks; keeping %s", out_path)
+            count_io("cache_hits")
+            return previous["output"]
 
+        df_new = engineer_audio_features(df_raw[~unchanged])
+        if list(df_new.columns) != previous["state"].get("feature_columns"):
+            logger.info("Derived columns changed since the last run; rebuilding")
+            return build_audio_features(df_raw, out_path, scaler_path, state_dir, full=True)
 
-def main():
+        # Old versions of changed or deleted rows leave the statistics and
+        # the new rows join them. Only the new rows are scored; stored rows
+        # keep the z-scores they were written with until the next full run.
+        df_prev = previous["output"]
+        df_prev.index = df_prev[KEY_COLUMN].astype(str).to_numpy()
+        scaler = previous["scaler"]
+        scaler.remove(df_prev.loc[stale])
+        scaler.partial_fit(df_new)
+        df_new = normalize_numeric(df_new, scaler=scaler)[list(df_prev.columns)]
+        df_new.index = df_new[KEY_COLUMN].astype(str).to_numpy()
+
+        if stale.empty:
+            # Pure additions are appended, so the existing rows are not
+            # rewritten.
+            df_out = pd.concat([df_prev, df_new], ignore_index=True)
+            append_df_csv(df_new, out_path, full_frame=df_out)
+        else:
+            df_out = pd.concat([df_prev.loc[kept], df_new]).loc[hashes.index].reset_index(drop=True)
+            save_df_csv(df_out, out_path)
+        count_io("cache_hits", len(kept))
+        logger.info(
+            "Engineered features for %d new or changed tracks (%d reused, %d removed)",
+            len(df_new), len(kept), len(prev_hashes.index.difference(hashes.index))
+        )
+
+    scaler.save(scaler_path)
+    save_state(state_dir, {
+        "input_columns": input_columns,
+        "feature_columns": [c for c in df_out.columns if c not in
+                            {f"{col}_z" for col in scaler.columns}],
+        "output": file_signature(out_path),
+        "scaler": file_signature(scaler_path),
+    }, hashes)
+    return df_out
+
+
+def main(full: bool = False):
     root = get_project_root()
     interim = root / "data" / "interim" / "audio_features.csv"
     processed_dir = root / "data" / "processed"
@@ -75,14 +222,16 @@ def main():
     df_raw = load_audio_features(interim)
     
     
-    df_feat = engineer_audio_features(df_raw)
-    
-    
-    df_norm = normalize_numeric(df_feat, exclude=["track_id"])
-    
-    
+    # Only new or changed tracks are engineered unless full=True; the
+    # fitted statistics are kept so later runs can update them in place.
     out_path = processed_dir / "audio_features_engineered.csv"
-    save_df_csv(df_norm, out_path)
+    build_audio_features(
+        df_raw,
+        out_path,
+        scaler_path=root / SCALER_PATH,
+        state_dir=processed_dir / "audio_features_engineered_state",
+        full=full
+    )
     logger.info("Saved engineered audio features to %s", out_path)
 
 
@@ -91,4 +240,8 @@ if __name__ == "__main__":
         level=logging.INFO,
         format="%(asctime)s %(levelname)s ▶ %(message)s"
     )
-    main()
+    parser = argparse.ArgumentParser(description="Engineer and normalize audio features")
+    parser.add_argument("--full", action="store_true",
+                        help="Rebuild every row and refit the statistics")
+    args = parser.parse_args()
+    main(full=args.full)
@@ -1,28 +1,99 @@
+import argparse
 import logging
+import os
 import re
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from typing import Dict, List, Optional
 
 import pandas as pd
 import numpy as np
 
+from src.preprocessing.schemas import read_dataset
 from src.preprocessing.utils import (
     get_project_root,
-    read_df_csv,
     save_df_csv
 )
 
 logger = logging.getLogger(__name__)
 
 
+LYRIC_STAT_DTYPES = {
+    "char_count": np.int32,
+    "word_count": np.int32,
+    "unique_words": np.int32,
+    "avg_word_length": np.float64,
+}
+
+# Lyrics per task sent to a worker process.
+DEFAULT_CHUNKSIZE = 4000
+
+# Below this many lyrics a process pool costs more than it saves.
+PARALLEL_MIN_ROWS = 20000
+
+
 def load_lyrics_data(raw_dir: Path) -> pd.DataFrame:
     
     path = raw_dir / "tcc_ceds_music.csv"
-    df = read_df_csv(path)
+    df = read_dataset("lyrics_topics", path)
     logger.info("Loaded lyrics dataset (%d rows)", len(df))
     return df
 
 
-def engineer_lyrical_features(df: pd.DataFrame) -> pd.DataFrame:
+def lyric_stats(texts: List[str]) -> Dict[str, np.ndarray]:
+    
+    # Every statistic comes from a single split of each text; counts are
+    # gathered in plain lists and converted to arrays once per chunk.
+    words, unique, letters = [], [], []
+    for text in texts:
+        tokens = text.split()
+        words.append(len(tokens))
+        unique.append(len(set(tokens)))
+        letters.append(len("".join(tokens)))
+
+    word_count = np.array(words, dtype=LYRIC_STAT_DTYPES["word_count"])
+    avg_len = np.zeros(len(texts), dtype=LYRIC_STAT_DTYPES["avg_word_length"])
+    np.divide(letters, word_count, out=avg_len, where=word_count > 0)
+    return {
+        "char_count": np.fromiter(map(len, texts), dtype=LYRIC_STAT_DTYPES["char_count"], count=len(texts)),
+        "word_count": word_count,
+        "unique_words": np.array(unique, dtype=LYRIC_STAT_DTYPES["unique_words"]),
+        "avg_word_length": avg_len,
+    }
+
+
+def _resolve_workers(workers: Optional[int], n_rows: int, chunksize: int) -> int:
+    if workers is None:
+        # Under the pipeline runner LOKY_MAX_CPU_COUNT holds the step's CPU share.
+        budget = int(os.environ.get("LOKY_MAX_CPU_COUNT") or os.cpu_count() or 1)
+        workers = min(budget, 8) if n_rows >= PARALLEL_MIN_ROWS else 1
+    return max(1, min(workers, -(-n_rows // chunksize)))
+
+
+def compute_lyric_stats(
+    lyrics: pd.Series,
+    workers: Optional[int] = None,
+    chunksize: int = DEFAULT_CHUNKSIZE
+) -> Dict[str, np.ndarray]:
+    
+    n_rows = len(lyrics)
+    if n_rows == 0:
+        return lyric_stats([])
+    n_workers = _resolve_workers(workers, n_rows, chunksize)
+
+    # Python strings exist for one chunk at a time in the serial path, and
+    # workers return only small numeric arrays, so nothing per-row comes
+    # back as Python objects.
+    chunks = (lyrics.iloc[i:i + chunksize].tolist() for i in range(0, n_rows, chunksize))
+    if n_workers <= 1:
+        parts = [lyric_stats(chunk) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            parts = list(pool.map(lyric_stats, chunks))
+    return {name: np.concatenate([p[name] for p in parts]) for name in LYRIC_STAT_DTYPES}
+
+
+def engineer_lyrical_features(df: pd.DataFrame, workers: Optional[int] = None) -> pd.DataFrame:
     
     df = df.copy()
     
@@ -30,13 +101,10 @@ def engineer_lyrical_features(df: pd.DataFrame) -> pd.DataFrame:
     df["lyrics"] = df["lyrics"].fillna("").astype(str)
     
     
-    df["char_count"] = df["lyrics"].apply(len)
-    df["word_count"] = df["lyrics"].apply(lambda x: len(x.split()))
-    
-    
-    df["unique_words"] = df["lyrics"].apply(
-        lambda x: len(set(x.split()))
-    )
+    stats = compute_lyric_stats(df["lyrics"], workers=workers)
+    df["char_count"] = stats["char_count"]
+    df["word_count"] = stats["word_count"]
+    df["unique_words"] = stats["unique_words"]
     
     df["lexical_diversity"] = np.where(
         df["word_count"] > 0,
@@ -44,14 +112,7 @@ def engineer_lyrical_features(df: pd.DataFrame) -> pd.DataFrame:
         0.0
     )
     
-    
-    def avg_word_len(text: str) -> float:
-        words = text.split()
-        if not words:
-            return 0.0
-        return sum(len(w) for w in words) / len(words)
-    
-    df["avg_word_length"] = df["lyrics"].apply(avg_word_len)
+    df["avg_word_length"] = stats["avg_word_length"]
     
     
     if "topic" in df.columns:
@@ -65,7 +126,7 @@ def engineer_lyrical_features(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
-def main():
+def main(workers: Optional[int] = None):
     root = get_project_root()
     raw_dir = root / "data" / "raw" / "dataset5_lyrics"
     processed_dir = root / "data" / "processed"
@@ -74,7 +135,7 @@ def main():
     df_raw = load_lyrics_data(raw_dir)
     
     
-    df_feat = engineer_lyrical_features(df_raw)
+    df_feat = engineer_lyrical_features(df_raw, workers=workers)
     
     
     out_path = processed_dir / "lyrics_features.csv"
@@ -87,4 +148,8 @@ if __name__ == "__main__":
         level=logging.INFO,
         format="%(asctime)s %(levelname)s ▶ %(message)s"
     )
-    main()
+    parser = argparse.ArgumentParser(description="Engineer lyrical features")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Processes for lyric statistics (default: by corpus size)")
+    args = parser.parse_args()
+    main(workers=args.workers)
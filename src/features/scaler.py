@@ -0,0 +1,134 @@
+import json
+import logging
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.preprocessing.utils import ensure_dir
+
+
+logger = logging.getLogger(__name__)
+
+
+class RunningScaler:
+
+
+    def __init__(self, columns: Optional[List[str]] = None):
+        # Per-column count, mean and sum of squared deviations (M2). NaNs are
+        # skipped per column, as in pandas' mean()/std().
+        self._reset(columns or [])
+
+    def _reset(self, columns: List[str]) -> None:
+        self.columns: List[str] = list(columns)
+        n = len(self.columns)
+        self.count = np.zeros(n, dtype=np.int64)
+        self.mean = np.zeros(n, dtype=np.float64)
+        self.m2 = np.zeros(n, dtype=np.float64)
+
+    def _values(self, df: pd.DataFrame) -> np.ndarray:
+        return df[self.columns].to_numpy(dtype=np.float64, na_value=np.nan)
+
+    def _moments(self, df: pd.DataFrame):
+        values = self._values(df)
+        count = (~np.isnan(values)).sum(axis=0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = np.nansum(values, axis=0) / count
+            m2 = np.nansum((values - mean) ** 2, axis=0)
+        return count, mean, m2
+
+    def partial_fit(self, df: pd.DataFrame) -> "RunningScaler":
+
+        if not self.columns:
+            self._reset(list(df.columns))
+        count, mean, m2 = self._moments(df)
+        if not count.any():
+            return self
+
+        # Chan et al.'s pairwise merge of (count, mean, M2); columns seen for
+        # the first time take the batch moments unchanged.
+        total = self.count + count
+        delta = mean - self.mean
+        with np.errstate(invalid="ignore", divide="ignore"):
+            merged_mean = self.mean + delta * (count / total)
+            merged_m2 = self.m2 + m2 + delta ** 2 * (self.count * count / total)
+        first = self.count == 0
+        self.mean = np.where(count == 0, self.mean, np.where(first, mean, merged_mean))
+        self.m2 = np.where(count == 0, self.m2, np.where(first, m2, merged_m2))
+        self.count = total
+        return self
+
+    def remove(self, df: pd.DataFrame) -> "RunningScaler":
+
+        # Inverse of partial_fit for rows that were previously added, so a
+        # changed or deleted row can be taken out without a full refit.
+        count, mean, m2 = self._moments(df)
+        if not count.any():
+            return self
+        rest = self.count - count
+        if (rest < 0).any():
+            raise ValueError("Cannot remove more rows than the scaler has seen")
+        with np.errstate(invalid="ignore", divide="ignore"):
+            rest_mean = (self.count * self.mean - count * mean) / rest
+            rest_m2 = self.m2 - m2 - (mean - rest_mean) ** 2 * (rest * count / self.count)
+        # Rounding can leave a tiny negative M2 where the remainder is constant.
+        self.mean = np.where(count == 0, self.mean, np.where(rest == 0, 0.0, rest_mean))
+        self.m2 = np.where(count == 0, self.m2, np.where(rest == 0, 0.0, np.maximum(rest_m2, 0.0)))
+        self.count = rest
+        return self
+
+    def fit(self, df: pd.DataFrame, columns: Optional[List[str]] = None) -> "RunningScaler":
+
+        self._reset(columns if columns is not None else list(df.columns))
+        return self.partial_fit(df)
+
+    @property
+    def std(self) -> np.ndarray:
+
+        # Sample standard deviation (ddof=1), matching pandas' Series.std().
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.sqrt(np.where(self.count > 1, self.m2 / (self.count - 1), np.nan))
+
+    def transform(self, df: pd.DataFrame, suffix: str = "_z") -> pd.DataFrame:
+
+        # One broadcast over the batch; columns with no spread map to 0.
+        std = self.std
+        scale = std > 0
+        with np.errstate(invalid="ignore", divide="ignore"):
+            z = (self._values(df) - self.mean) / np.where(scale, std, 1.0)
+        z[:, ~scale] = 0.0
+        return pd.DataFrame(z, index=df.index, columns=[f"{c}{suffix}" for c in self.columns])
+
+    def to_dict(self) -> Dict[str, Any]:
+
+        return {
+            "columns": self.columns,
+            "count": self.count.tolist(),
+            "mean": self.mean.tolist(),
+            "m2": self.m2.tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "RunningScaler":
+
+        scaler = cls(data["columns"])
+        scaler.count = np.asarray(data["count"], dtype=np.int64)
+        scaler.mean = np.asarray(data["mean"], dtype=np.float64)
+        scaler.m2 = np.asarray(data["m2"], dtype=np.float64)
+        return scaler
+
+    def save(self, path: Path) -> None:
+
+        ensure_dir(path)
+        tmp = path.with_suffix(".tmp")
+        with tmp.open("w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2)
+        tmp.replace(path)
+        logger.info("Saved scaler statistics for %d columns to %s", len(self.columns), path)
+
+    @classmethod
+    def load(cls, path: Path) -> "RunningScaler":
+
+        with Path(path).open("r", encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
@@ -8,6 +8,7 @@ from sklearn.ensemble import RandomForestClassifier
 from sklearn.metrics import classification_report, accuracy_score
 import joblib
 
+from src.preprocessing.schemas import read_dataset
 from src.preprocessing.utils import get_project_root
 
 
@@ -18,10 +19,17 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+FEATURE_COLS = [
+    "danceability", "energy", "loudness", "speechiness",
+    "acousticness", "instrumentalness", "liveness",
+    "valence", "tempo"
+]
+
+
 def load_data(path: Path) -> pd.DataFrame:
     
     logger.info("Loading genre data from %s", path)
-    df = pd.read_csv(path)
+    df = read_dataset("genres_v2", path, columns=FEATURE_COLS + ["genre"])
     
     df = df.dropna(subset=["genre"])
     return df
@@ -29,12 +37,7 @@ def load_data(path: Path) -> pd.DataFrame:
 
 def preprocess(df: pd.DataFrame):
     
-    feature_cols = [
-        "danceability", "energy", "loudness", "speechiness",
-        "acousticness", "instrumentalness", "liveness",
-        "valence", "tempo"
-    ]
-    X = df[feature_cols].astype(float)
+    X = df[FEATURE_COLS].astype(float)
     y = df["genre"].astype(str)
     return X, y
 
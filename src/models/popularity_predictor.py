@@ -8,6 +8,7 @@ from sklearn.ensemble import RandomForestRegressor
 from sklearn.metrics import mean_squared_error, r2_score
 import joblib
 
+from src.preprocessing.schemas import read_dataset
 from src.preprocessing.utils import get_project_root
 
 
@@ -21,7 +22,12 @@ logger = logging.getLogger(__name__)
 def load_data(path: Path) -> pd.DataFrame:
     
     logger.info("Loading popularity data from %s", path)
-    df = pd.read_csv(path)
+    # Free-text columns are never used as features, so they are not parsed.
+    df = read_dataset(
+        "track_pool",
+        path,
+        exclude=["Unnamed: 0", "track_id", "artists", "album_name", "track_name"]
+    )
 
     df = df.dropna(subset=["popularity"])
     return df
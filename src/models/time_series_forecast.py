@@ -5,7 +5,8 @@ import pandas as pd
 from statsmodels.tsa.arima.model import ARIMA
 import joblib
 
-from src.preprocessing.utils import get_project_root, read_json_dir
+from src.preprocessing.utils import get_project_root
+from src.data_ingestion.recently_played_sync import iter_play_history
 
 
 logging.basicConfig(
@@ -18,15 +19,7 @@ logger = logging.getLogger(__name__)
 def load_play_counts(raw_dir: Path) -> pd.Series:
     
     logger.info("Loading recently played JSON from %s", raw_dir)
-    blobs = read_json_dir(raw_dir, pattern="recently_played_*.json")
-
-    
-    played = []
-    for blob in blobs:
-        items = blob.get("items", [])
-        for it in items:
-           
-            played.append(it["played_at"])
+    played = [it["played_at"] for it in iter_play_history(raw_dir)]
 
     
     df = pd.DataFrame({"played_at": pd.to_datetime(played)})
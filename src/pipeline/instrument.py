@@ -0,0 +1,106 @@
+import cProfile
+import json
+import platform
+import resource
+import time
+import logging
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+from src.pipeline.steps import Step
+from src.preprocessing.utils import IO_COUNTERS, ensure_dir
+
+
+logger = logging.getLogger(__name__)
+
+
+def _maxrss_mb(who: int) -> float:
+    # ru_maxrss is KiB on Linux and bytes on macOS.
+    rss = resource.getrusage(who).ru_maxrss
+    return rss / (1024 * 1024) if platform.system() == "Darwin" else rss / 1024
+
+
+def run_measured(step: Step, profile_path: Optional[Path] = None) -> Dict[str, Any]:
+
+    # CPU time and peak RSS include child processes (joblib/loky workers).
+    # In a fresh worker process peak RSS is the step's own; when steps run
+    # inline it is the high-water mark of the whole run so far.
+    before = IO_COUNTERS.copy()
+    self_start = resource.getrusage(resource.RUSAGE_SELF)
+    child_start = resource.getrusage(resource.RUSAGE_CHILDREN)
+    wall_start = time.perf_counter()
+
+    if profile_path is not None:
+        profiler = cProfile.Profile()
+        try:
+            profiler.runcall(step.run)
+        finally:
+            ensure_dir(profile_path)
+            profiler.dump_stats(str(profile_path))
+    else:
+        step.run()
+
+    wall = time.perf_counter() - wall_start
+    self_end = resource.getrusage(resource.RUSAGE_SELF)
+    child_end = resource.getrusage(resource.RUSAGE_CHILDREN)
+    cpu = (self_end.ru_utime - self_start.ru_utime) + (self_end.ru_stime - self_start.ru_stime)
+    child_cpu = (child_end.ru_utime - child_start.ru_utime) + (child_end.ru_stime - child_start.ru_stime)
+    delta = IO_COUNTERS - before
+    return {
+        "wall_s": round(wall, 3),
+        "cpu_s": round(cpu + child_cpu, 3),
+        "peak_rss_mb": round(max(
+            _maxrss_mb(resource.RUSAGE_SELF), _maxrss_mb(resource.RUSAGE_CHILDREN)
+        ), 1),
+        "rows_in": delta.get("rows_in", 0),
+        "rows_out": delta.get("rows_out", 0),
+        "cache_hits": delta.get("cache_hits", 0),
+        "profile": str(profile_path) if profile_path is not None else None,
+    }
+
+
+def total_bytes(root: Path, patterns: Iterable[str]) -> int:
+
+    total = 0
+    for pattern in patterns:
+        for path in root.glob(pattern):
+            if path.is_dir():
+                total += sum(p.stat().st_size for p in path.rglob("*") if p.is_file())
+            elif path.exists():
+                total += path.stat().st_size
+    return total
+
+
+class RunReport:
+
+
+    def __init__(self, cpus: int, step_names: Iterable[str] = ()):
+        self.started_at = datetime.now(timezone.utc)
+        self.run_id = self.started_at.strftime("%Y%m%dT%H%M%S.%fZ")
+        self.cpus = cpus
+        # Listed in pipeline order regardless of completion order.
+        self.steps: Dict[str, Dict[str, Any]] = {name: {"status": "pending"} for name in step_names}
+        self._start = time.perf_counter()
+
+    def add(self, name: str, status: str, **metrics: Any) -> None:
+
+        self.steps.setdefault(name, {}).update(status=status, **metrics)
+
+    def to_dict(self) -> Dict[str, Any]:
+
+        return {
+            "run_id": self.run_id,
+            "started_at": self.started_at.isoformat(),
+            "cpus": self.cpus,
+            "wall_s": round(time.perf_counter() - self._start, 3),
+            "steps": self.steps,
+        }
+
+    def write(self, path: Path) -> Path:
+
+        ensure_dir(path)
+        with path.open("w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2)
+        logger.info("Wrote pipeline run report to %s", path)
+        return path
@@ -0,0 +1,202 @@
+import logging
+import multiprocessing
+import os
+import sys
+import traceback
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from src.pipeline.instrument import RunReport, run_measured, total_bytes
+from src.pipeline.state import PipelineState, step_fingerprint
+from src.pipeline.steps import PIPELINE_STEPS, Step, dependency_graph
+from src.preprocessing.utils import get_project_root
+
+
+logger = logging.getLogger(__name__)
+
+
+STATE_FILE = Path("data") / "pipeline_state.json"
+REPORT_DIR = Path("reports") / "pipeline_runs"
+
+# Thread-pool sizes read by joblib/loky, OpenMP and BLAS when a step starts.
+_CPU_ENV_VARS = (
+    "LOKY_MAX_CPU_COUNT", "OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS"
+)
+
+
+def resolve_force(steps: List[Step], force: Optional[Iterable[str]]) -> set:
+
+    names = {s.name for s in steps}
+    wanted = set(force or [])
+    if "all" in wanted:
+        return names
+    unknown = wanted - names
+    if unknown:
+        raise ValueError(f"Unknown pipeline steps: {sorted(unknown)}")
+    return wanted
+
+
+def step_cpus(step: Step, budget: int) -> int:
+
+    return budget if step.cpus < 0 else max(1, min(step.cpus, budget))
+
+
+def _run_in_worker(step: Step, cpus: int, profile_path: Optional[Path]) -> Dict[str, Any]:
+    # Runs in a fresh spawned process, so these limits are in place before
+    # sklearn/numpy are imported and n_jobs=-1 stays inside the step's share.
+    for var in _CPU_ENV_VARS:
+        os.environ[var] = str(cpus)
+    if not logging.getLogger().handlers:
+        logging.basicConfig(
+            level=logging.INFO,
+            format="%(asctime)s %(levelname)s ▶ %(message)s"
+        )
+    try:
+        return run_measured(step, profile_path)
+    except Exception as exc:
+        # Exceptions from third-party libraries do not always pickle; ship
+        # the formatted traceback back to the parent instead.
+        raise RuntimeError(
+            f"{step.name} failed: {exc!r}\n{traceback.format_exc()}"
+        ) from None
+
+
+def run_pipeline(
+    steps: Optional[List[Step]] = None,
+    force: Optional[Iterable[str]] = None,
+    root: Optional[Path] = None,
+    state_path: Optional[Path] = None,
+    cpus: Optional[int] = None,
+    report_dir: Optional[Path] = None,
+    profile: bool = False
+) -> Dict[str, str]:
+
+    steps = PIPELINE_STEPS if steps is None else steps
+    root = root or get_project_root()
+    state = PipelineState(state_path or root / STATE_FILE, root)
+    forced = resolve_force(steps, force)
+    graph = dependency_graph(steps)
+    budget = max(1, cpus or os.cpu_count() or 1)
+    by_name = {s.name: s for s in steps}
+    report = RunReport(budget, [s.name for s in steps])
+    report_dir = report_dir or root / REPORT_DIR
+
+    # Steps become ready once every step they read from has finished; a
+    # failure marks all of its transitive dependents as blocked.
+    status: Dict[str, str] = {}
+    pending: List[str] = [s.name for s in steps]
+    running: Dict[Future, Step] = {}
+    fingerprints: Dict[str, str] = {}
+    # Input digests taken just before each step starts. They are what gets
+    # recorded, so an input rewritten while the step runs is seen as changed
+    # on the next run instead of being marked as already consumed.
+    input_hashes: Dict[str, Dict[str, str]] = {}
+    used = 0
+
+    pool = None
+    if budget > 1:
+        # A fresh process per step keeps thread-pool limits and peak RSS
+        # per step. max_tasks_per_child needs Python 3.11; on 3.10 workers
+        # are reused, so a library loaded by an earlier step keeps the
+        # thread count it started with.
+        extra = {"max_tasks_per_child": 1} if sys.version_info >= (3, 11) else {}
+        pool = ProcessPoolExecutor(
+            max_workers=budget,
+            mp_context=multiprocessing.get_context("spawn"),
+            **extra
+        )
+
+    def profile_path(step: Step) -> Optional[Path]:
+        return report_dir / report.run_id / f"{step.name}.prof" if profile else None
+
+    def finish(step: Step, error: Optional[BaseException], metrics: Dict[str, Any]) -> None:
+        cpus = step_cpus(step, budget)
+        if error is not None:
+            status[step.name] = "failed"
+            report.add(step.name, "failed", cpus=cpus, error=str(error).splitlines()[0])
+            logger.error("%s", error)
+            return
+        report.add(
+            step.name, "ran", cpus=cpus,
+            bytes_in=total_bytes(root, step.inputs),
+            bytes_out=total_bytes(root, step.outputs),
+            **metrics
+        )
+        state.record(
+            step.name, fingerprints[step.name],
+            inputs=input_hashes[step.name],
+            outputs=state.hash_patterns(step.outputs)
+        )
+        state.save()
+        status[step.name] = "ran"
+        logger.info(
+            "Finished %s in %.1fs (cpu %.1fs, peak rss %.0f MB)",
+            step.name, metrics["wall_s"], metrics["cpu_s"], metrics["peak_rss_mb"]
+        )
+
+    try:
+        while pending or running:
+            progressed = False
+            for name in list(pending):
+                deps = graph[name]
+                if any(status.get(d) in ("failed", "blocked") for d in deps):
+                    status[name] = "blocked"
+                    report.add(name, "blocked")
+                    pending.remove(name)
+                    progressed = True
+                    logger.warning("Skipping %s: an upstream step failed", name)
+                    continue
+                if not all(status.get(d) in ("ran", "skipped") for d in deps):
+                    continue
+
+                step = by_name[name]
+                # Inputs are hashed only now, after upstream steps wrote them.
+                fingerprints[name] = step_fingerprint(step)
+                inputs = input_hashes[name] = state.hash_patterns(step.inputs)
+                if name not in forced and state.is_fresh(name, fingerprints[name], inputs, step.outputs):
+                    logger.info("Skipping %s (inputs and code unchanged)", name)
+                    status[name] = "skipped"
+                    # Skipping is the step-level cache hit; nothing is read.
+                    report.add(
+                        name, "skipped", wall_s=0.0, cache_hits=1,
+                        bytes_in=0, bytes_out=total_bytes(root, step.outputs)
+                    )
+                    pending.remove(name)
+                    progressed = True
+                    continue
+
+                need = step_cpus(step, budget)
+                if running and used + need > budget:
+                    continue
+                pending.remove(name)
+                progressed = True
+                logger.info("Running %s on %d CPU(s)", name, need)
+                if pool is None:
+                    try:
+                        metrics = run_measured(step, profile_path(step))
+                    except Exception as exc:
+                        logger.exception("%s failed", name)
+                        finish(step, exc, {})
+                    else:
+                        finish(step, None, metrics)
+                else:
+                    running[pool.submit(_run_in_worker, step, need, profile_path(step))] = step
+                    used += need
+
+            if running:
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in done:
+                    step = running.pop(future)
+                    used -= step_cpus(step, budget)
+                    error = future.exception()
+                    finish(step, error, {} if error else future.result())
+            elif pending and not progressed:
+                raise RuntimeError(f"Pipeline cannot make progress: {pending}")
+    finally:
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+        state.save()
+        report.write(report_dir / f"{report.run_id}.json")
+
+    return {s.name: status.get(s.name, "blocked") for s in steps}
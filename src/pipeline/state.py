@@ -0,0 +1,140 @@
+import ast
+import hashlib
+import importlib.util
+import json
+import logging
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from src.preprocessing.utils import ensure_dir, file_signature, sha256_file
+
+
+logger = logging.getLogger(__name__)
+
+
+def _module_source(module: str) -> Optional[Path]:
+    spec = importlib.util.find_spec(module)
+    if spec is None or not spec.origin or not spec.origin.endswith(".py"):
+        return None
+    return Path(spec.origin)
+
+
+def _src_imports(path: Path) -> Set[str]:
+    tree = ast.parse(path.read_text(encoding="utf-8"))
+    found = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.ImportFrom) and node.module and node.module.startswith("src."):
+            found.add(node.module)
+        elif isinstance(node, ast.Import):
+            found.update(a.name for a in node.names if a.name.startswith("src."))
+    return found
+
+
+def code_fingerprint(modules: Iterable[str]) -> str:
+
+    # Hashes the step's own modules plus every src.* module they import,
+    # transitively, so a change to a shared helper re-runs its users.
+    pending = list(modules)
+    seen: Dict[str, Path] = {}
+    while pending:
+        module = pending.pop()
+        if module in seen:
+            continue
+        source = _module_source(module)
+        if source is None:
+            continue
+        seen[module] = source
+        pending.extend(_src_imports(source) - set(seen))
+
+    digest = hashlib.sha256()
+    for module in sorted(seen):
+        digest.update(module.encode())
+        digest.update(sha256_file(seen[module]).encode())
+    return digest.hexdigest()
+
+
+def step_fingerprint(step: Any) -> str:
+
+    # Code plus call arguments, so a step re-runs when either changes.
+    digest = hashlib.sha256(code_fingerprint([step.module]).encode())
+    digest.update(json.dumps(step.kwargs, sort_keys=True, default=str).encode())
+    return digest.hexdigest()
+
+
+class PipelineState:
+
+
+    def __init__(self, path: Path, root: Path):
+        self.path = Path(path)
+        self.root = Path(root)
+        data: Dict[str, Any] = {}
+        if self.path.exists():
+            with self.path.open("r", encoding="utf-8") as f:
+                data = json.load(f)
+        self.steps: Dict[str, Dict[str, Any]] = data.get("steps", {})
+        # Content digests keyed by path, reused while size and mtime match.
+        self.files: Dict[str, Dict[str, str]] = data.get("files", {})
+
+    def _rel(self, path: Path) -> str:
+        return path.relative_to(self.root).as_posix()
+
+    def hash_path(self, path: Path) -> str:
+
+        if path.is_dir():
+            digest = hashlib.sha256()
+            for child in sorted(p for p in path.rglob("*") if p.is_file()):
+                digest.update(child.relative_to(path).as_posix().encode())
+                digest.update(self.hash_path(child).encode())
+            return digest.hexdigest()
+
+        key = self._rel(path)
+        signature = file_signature(path)
+        cached = self.files.get(key)
+        if cached and cached["signature"] == signature:
+            return cached["sha256"]
+        sha = sha256_file(path)
+        self.files[key] = {"signature": signature, "sha256": sha}
+        return sha
+
+    def hash_patterns(self, patterns: Iterable[str]) -> Dict[str, str]:
+
+        hashes: Dict[str, str] = {}
+        for pattern in patterns:
+            for path in sorted(self.root.glob(pattern)):
+                hashes[self._rel(path)] = self.hash_path(path)
+        return hashes
+
+    def is_fresh(
+        self,
+        name: str,
+        fingerprint: str,
+        inputs: Dict[str, str],
+        outputs: List[str]
+    ) -> bool:
+
+        record = self.steps.get(name)
+        if record is None:
+            return False
+        if record["fingerprint"] != fingerprint or record["inputs"] != inputs:
+            return False
+        # Outputs must still be on disk exactly as this step left them.
+        current = self.hash_patterns(outputs)
+        return bool(current) and current == record["outputs"]
+
+    def record(
+        self,
+        name: str,
+        fingerprint: str,
+        inputs: Dict[str, str],
+        outputs: Dict[str, str]
+    ) -> None:
+
+        self.steps[name] = {"fingerprint": fingerprint, "inputs": inputs, "outputs": outputs}
+
+    def save(self) -> None:
+
+        ensure_dir(self.path)
+        tmp = self.path.with_suffix(".tmp")
+        with tmp.open("w", encoding="utf-8") as f:
+            json.dump({"steps": self.steps, "files": self.files}, f, indent=2, sort_keys=True)
+        tmp.replace(self.path)
@@ -0,0 +1,189 @@
+import fnmatch
+import importlib
+from typing import Any, Callable, Dict, List, Optional
+
+
+class Step:
+
+
+    def __init__(
+        self,
+        name: str,
+        target: str,
+        inputs: List[str],
+        outputs: List[str],
+        kwargs: Optional[Dict[str, Any]] = None,
+        cpus: int = 1,
+        after: Optional[List[str]] = None
+    ):
+        # target is "module:function" so a step can be resolved lazily (and
+        # in another process) without importing every model library up front.
+        # cpus=-1 claims the whole CPU budget, like n_jobs=-1.
+        self.name = name
+        self.target = target
+        self.inputs = inputs
+        self.outputs = outputs
+        self.kwargs = kwargs or {}
+        self.cpus = cpus
+        self.after = after or []
+
+    @property
+    def module(self) -> str:
+        return self.target.split(":", 1)[0]
+
+    def load(self) -> Callable[..., Any]:
+
+        module, func = self.target.split(":", 1)
+        return getattr(importlib.import_module(module), func)
+
+    def run(self) -> Any:
+
+        return self.load()(**self.kwargs)
+
+    def with_kwargs(self, **overrides: Any) -> "Step":
+
+        return Step(
+            self.name, self.target, self.inputs, self.outputs,
+            kwargs={**self.kwargs, **overrides}, cpus=self.cpus, after=self.after
+        )
+
+    def reads_from(self, other: "Step") -> bool:
+
+        # An output feeds this step if one of our input globs matches it or
+        # it is a directory holding files we read.
+        for out in other.outputs:
+            for pattern in self.inputs:
+                if fnmatch.fnmatch(out, pattern) or pattern.startswith(out.rstrip("/") + "/"):
+                    return True
+        return False
+
+    def __repr__(self) -> str:
+        return f"Step({self.name!r}, {self.target!r})"
+
+
+def dependency_graph(steps: List[Step]) -> Dict[str, List[str]]:
+
+    names = {s.name for s in steps}
+    graph: Dict[str, List[str]] = {}
+    for step in steps:
+        unknown = set(step.after) - names
+        if unknown:
+            raise ValueError(f"{step.name} runs after unknown steps: {sorted(unknown)}")
+        deps = [o.name for o in steps if o is not step and step.reads_from(o)]
+        graph[step.name] = sorted(set(deps) | set(step.after))
+
+    # Reject cycles up front rather than deadlocking the scheduler.
+    state: Dict[str, int] = {}
+
+    def visit(name: str, path: List[str]) -> None:
+        if state.get(name) == 2:
+            return
+        if state.get(name) == 1:
+            raise ValueError(f"Pipeline dependency cycle: {' -> '.join(path + [name])}")
+        state[name] = 1
+        for dep in graph[name]:
+            visit(dep, path + [name])
+        state[name] = 2
+
+    for name in graph:
+        visit(name, [])
+    return graph
+
+
+# Paths are globs relative to the project root.
+PIPELINE_STEPS: List[Step] = [
+    Step(
+        "clean_audio_features",
+        "src.preprocessing.clean_audio_features:main",
+        # The audio_features.sqlite store is derived from the snapshots and
+        # rewritten by this step, so only the snapshots are fingerprinted.
+        inputs=[
+            "data/raw/spotify_api/audio_features_*",
+            "data/raw/full_track_pool/dataset.csv",
+        ],
+        outputs=["data/interim/audio_features.csv"],
+    ),
+    Step(
+        "assemble_wrapped_tracks",
+        "src.preprocessing.assemble_wrapped_tracks:main",
+        inputs=[
+            "data/interim/top_tracks.csv",
+            "data/interim/recently_played.csv",
+            "data/interim/saved_tracks.csv",
+            "data/interim/playlist_tracks_top3.csv",
+        ],
+        outputs=["data/interim/wrapped_tracks.csv"],
+    ),
+    Step(
+        "merge_lyrics_topics",
+        "src.preprocessing.merge_lyrics_topics:main",
+        inputs=[
+            "data/interim/wrapped_tracks.csv",
+            "data/raw/dataset5_lyrics/tcc_ceds_music.csv",
+        ],
+        outputs=["data/processed/tracks_with_topics.csv"],
+    ),
+    Step(
+        "audio_feature_engineering",
+        "src.features.audio_feature_engineering:main",
+        inputs=["data/interim/audio_features.csv"],
+        outputs=[
+            "data/processed/audio_features_engineered.csv",
+            "models/audio_feature_scaler.json",
+        ],
+    ),
+    Step(
+        "lyrical_feature_engineering",
+        "src.features.lyrical_feature_engineering:main",
+        inputs=["data/raw/dataset5_lyrics/tcc_ceds_music.csv"],
+        outputs=["data/processed/lyrics_features.csv"],
+        cpus=4,
+    ),
+    Step(
+        "genre_classifier",
+        "src.models.genre_classifier:train_and_save",
+        inputs=["data/raw/genres_v2/genres_v2.csv"],
+        outputs=["models/genre_classifier_v1.pkl"],
+        cpus=-1,
+    ),
+    Step(
+        "popularity_predictor",
+        "src.models.popularity_predictor:train_and_save",
+        inputs=["data/raw/full_track_pool/dataset.csv"],
+        outputs=["models/popularity_predictor_v1.pkl"],
+        cpus=-1,
+    ),
+    Step(
+        "time_series_forecast",
+        "src.models.time_series_forecast:train_and_save",
+        inputs=["data/raw/spotify_api/recently_played_*"],
+        outputs=[
+            "models/ts_forecast_model_v1.pkl",
+            "data/processed/play_counts_forecast.csv",
+        ],
+    ),
+    Step(
+        "analytics_store",
+        "src.preprocessing.analytics_store:main",
+        inputs=[
+            "data/interim/wrapped_tracks.csv",
+            "data/interim/audio_features.csv",
+            "data/interim/top_tracks.csv",
+            "data/interim/saved_tracks.csv",
+            "data/interim/recently_played.csv",
+            "data/interim/playlist_tracks_top3.csv",
+            "data/interim/user_playlists.csv",
+            "data/processed/tracks_with_topics.csv",
+            "data/processed/audio_features_engineered.csv",
+            "data/processed/lyrics_features.csv",
+        ],
+        outputs=["data/analytics.duckdb"],
+    ),
+    Step(
+        "rag_index",
+        "src.rag_chat.indexer:main",
+        inputs=["data/raw/spotify_api/recently_played_*"],
+        outputs=["data/processed/rag_index"],
+        kwargs={"pattern": "recently_played_*", "max_docs": None, "use_local": True},
+    ),
+]
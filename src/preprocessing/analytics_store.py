@@ -0,0 +1,276 @@
+import argparse
+import logging
+import re
+import pandas as pd
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from src.preprocessing.utils import (
+    get_project_root,
+    ensure_dir,
+    file_signature,
+    fresh_columnar_path,
+    read_df_columns,
+    read_df_csv
+)
+
+try:
+    import duckdb
+except ImportError:
+    duckdb = None
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_STORE = Path("data") / "analytics.duckdb"
+
+# Table name -> (CSV path relative to the project root, sort keys). Rows are
+# stored sorted so DuckDB's per-row-group min/max statistics can skip most
+# of a table for selective filters on the leading keys.
+TABLES: Dict[str, Tuple[str, List[str]]] = {
+    "wrapped_tracks": ("data/interim/wrapped_tracks.csv", ["track_id"]),
+    "audio_features": ("data/interim/audio_features.csv", ["track_id"]),
+    "top_tracks": ("data/interim/top_tracks.csv", ["track_id"]),
+    "saved_tracks": ("data/interim/saved_tracks.csv", ["saved_at"]),
+    "recently_played": ("data/interim/recently_played.csv", ["played_at"]),
+    "playlist_tracks": ("data/interim/playlist_tracks_top3.csv", ["playlist_id", "added_at"]),
+    "user_playlists": ("data/interim/user_playlists.csv", ["playlist_id"]),
+    "tracks_with_topics": ("data/processed/tracks_with_topics.csv", ["track_id"]),
+    "audio_features_engineered": ("data/processed/audio_features_engineered.csv", ["track_id"]),
+    "lyrics_features": ("data/processed/lyrics_features.csv", ["genre", "main_topic"]),
+}
+
+# Operators accepted in query filters; values are always bound parameters.
+FILTER_OPS = {"=", "!=", "<", "<=", ">", ">=", "in", "not in", "like", "is null", "is not null"}
+
+Filter = Tuple[str, str, Any]
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _where_clause(filters: Optional[Sequence[Filter]]) -> Tuple[str, List[Any]]:
+    clauses, params = [], []
+    for column, op, *rest in filters or []:
+        op = op.lower()
+        if op not in FILTER_OPS:
+            raise ValueError(f"Unsupported filter operator: {op}")
+        if op in ("is null", "is not null"):
+            clauses.append(f"{_quote(column)} {op.upper()}")
+        elif op in ("in", "not in"):
+            values = list(rest[0])
+            if not values:
+                clauses.append("FALSE" if op == "in" else "TRUE")
+                continue
+            marks = ", ".join("?" * len(values))
+            clauses.append(f"{_quote(column)} {op.upper()} ({marks})")
+            params.extend(values)
+        else:
+            clauses.append(f"{_quote(column)} {op.upper()} ?")
+            params.append(rest[0])
+    return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+
+def _filter_frame(df: pd.DataFrame, filters: Optional[Sequence[Filter]]) -> pd.DataFrame:
+    # pandas equivalent of _where_clause for installs without duckdb.
+    mask = pd.Series(True, index=df.index)
+    for column, op, *rest in filters or []:
+        op = op.lower()
+        col = df[column]
+        value = rest[0] if rest else None
+        if op == "=":
+            mask &= col == value
+        elif op == "!=":
+            mask &= col != value
+        elif op == "<":
+            mask &= col < value
+        elif op == "<=":
+            mask &= col <= value
+        elif op == ">":
+            mask &= col > value
+        elif op == ">=":
+            mask &= col >= value
+        elif op == "in":
+            mask &= col.isin(list(value))
+        elif op == "not in":
+            mask &= ~col.isin(list(value))
+        elif op == "like":
+            # Only % and _ are wildcards; everything else matches literally.
+            pattern = "^" + "".join(
+                ".*" if ch == "%" else "." if ch == "_" else re.escape(ch)
+                for ch in str(value)
+            ) + "$"
+            mask &= col.astype(str).str.match(pattern)
+        elif op == "is null":
+            mask &= col.isna()
+        elif op == "is not null":
+            mask &= col.notna()
+        else:
+            raise ValueError(f"Unsupported filter operator: {op}")
+    return df[mask.fillna(False)]
+
+
+class AnalyticsStore:
+
+
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        root: Optional[Path] = None,
+        read_only: bool = False
+    ):
+        if duckdb is None:
+            raise ImportError("AnalyticsStore requires duckdb (pip install duckdb)")
+        self.root = root or get_project_root()
+        self.path = Path(path) if path else self.root / DEFAULT_STORE
+        ensure_dir(self.path)
+        self._conn = duckdb.connect(str(self.path), read_only=read_only)
+        if not read_only:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS _sources (name VARCHAR PRIMARY KEY, signature VARCHAR)"
+            )
+
+    def tables(self) -> List[str]:
+
+        rows = self._conn.execute(
+            "SELECT table_name FROM information_schema.tables "
+            "WHERE table_schema = 'main' AND table_name <> '_sources'"
+        ).fetchall()
+        return sorted(r[0] for r in rows)
+
+    def loaded_signature(self, name: str) -> Optional[str]:
+
+        row = self._conn.execute(
+            "SELECT signature FROM _sources WHERE name = ?", [name]
+        ).fetchone()
+        return row[0] if row else None
+
+    def is_current(self, name: str) -> bool:
+
+        # True when the table was loaded from the source file as it is now.
+        source = self.root / TABLES[name][0]
+        if not source.exists():
+            return False
+        current = file_signature(fresh_columnar_path(source) or source)
+        return self.loaded_signature(name) == current
+
+    def ingest(self, name: str, force: bool = False) -> bool:
+
+        rel_path, sort_keys = TABLES[name]
+        source = self.root / rel_path
+        if not source.exists():
+            logger.warning("Skipping %s: %s not found", name, source)
+            return False
+
+        # Typed columnar copies are preferred over re-inferring CSV types.
+        sidecar = fresh_columnar_path(source)
+        signature = file_signature(sidecar or source)
+        if not force and self.loaded_signature(name) == signature and name in self.tables():
+            return False
+
+        if sidecar is not None and sidecar.suffix == ".parquet":
+            scan, scan_path = "read_parquet(?)", sidecar
+        else:
+            scan, scan_path = "read_csv_auto(?, header = true)", source
+        columns = read_df_columns(source)
+        keys = [k for k in sort_keys if k in columns]
+        order = f" ORDER BY {', '.join(_quote(k) for k in keys)}" if keys else ""
+        self._conn.execute(
+            f"CREATE OR REPLACE TABLE {_quote(name)} AS SELECT * FROM {scan}{order}",
+            [scan_path.as_posix()]
+        )
+        self._conn.execute(
+            "INSERT OR REPLACE INTO _sources (name, signature) VALUES (?, ?)", [name, signature]
+        )
+        count = self._conn.execute(f"SELECT COUNT(*) FROM {_quote(name)}").fetchone()[0]
+        logger.info("Ingested %s (%d rows) into %s", name, count, self.path)
+        return True
+
+    def ingest_all(self, force: bool = False) -> List[str]:
+
+        return [name for name in TABLES if self.ingest(name, force=force)]
+
+    def query(
+        self,
+        table: str,
+        columns: Optional[List[str]] = None,
+        filters: Optional[Sequence[Filter]] = None,
+        order_by: Optional[List[str]] = None,
+        limit: Optional[int] = None
+    ) -> pd.DataFrame:
+
+        # Only the requested columns are scanned, and filters on the sort
+        # keys prune row groups before any data is read.
+        select = ", ".join(_quote(c) for c in columns) if columns else "*"
+        where, params = _where_clause(filters)
+        sql = f"SELECT {select} FROM {_quote(table)}{where}"
+        if order_by:
+            sql += " ORDER BY " + ", ".join(_quote(c) for c in order_by)
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        return self._conn.execute(sql, params).df()
+
+    def sql(self, query: str, params: Optional[List[Any]] = None) -> pd.DataFrame:
+
+        return self._conn.execute(query, params or []).df()
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> "AnalyticsStore":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def query_table(
+    table: str,
+    columns: Optional[List[str]] = None,
+    filters: Optional[Sequence[Filter]] = None,
+    root: Optional[Path] = None
+) -> pd.DataFrame:
+
+    # Reads from the analytics store when duckdb is installed and the table
+    # has been ingested; otherwise falls back to the CSV (or its columnar
+    # copy) with the same projection and filters applied in pandas.
+    root = root or get_project_root()
+    store_path = root / DEFAULT_STORE
+    if duckdb is not None and store_path.exists():
+        try:
+            with AnalyticsStore(store_path, root=root, read_only=True) as store:
+                if table in store.tables():
+                    if store.is_current(table):
+                        return store.query(table, columns=columns, filters=filters)
+                    logger.warning(
+                        "%s changed since it was loaded into %s; reading it directly "
+                        "(run python -m src.preprocessing.analytics_store to refresh)",
+                        table, store_path
+                    )
+        except duckdb.IOException as exc:
+            logger.warning("Analytics store unavailable (%s); reading %s directly", exc, table)
+
+    rel_path, _ = TABLES[table]
+    filter_cols = [f[0] for f in filters or []]
+    wanted = None if columns is None else list(dict.fromkeys(columns + filter_cols))
+    df = _filter_frame(read_df_csv(root / rel_path, columns=wanted), filters)
+    return df[columns] if columns is not None else df
+
+
+def main(force: bool = False) -> List[str]:
+    with AnalyticsStore() as store:
+        return store.ingest_all(force=force)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s %(levelname)s %(name)s ▶ %(message)s"
+    )
+    parser = argparse.ArgumentParser(
+        description="Load interim and processed tables into the DuckDB analytics store"
+    )
+    parser.add_argument("--force", action="store_true", help="Reload every table")
+    args = parser.parse_args()
+    main(force=args.force)
@@ -0,0 +1,177 @@
+import json
+import logging
+import pandas as pd
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from src.preprocessing.utils import (
+    get_project_root,
+    columnar_path,
+    count_io,
+    ensure_dir,
+    file_signature,
+    save_df_csv,
+    read_df_csv
+)
+
+logger = logging.getLogger(__name__)
+
+
+# Interim sources in priority order; the first file listing a track wins.
+# Each role lists the column names it has had across exporter versions.
+SOURCES: Dict[str, Dict[str, List[str]]] = {
+    "top_tracks.csv": {
+        "track_id": ["track_id", "id"],
+        "track_name": ["track_name", "name"],
+        "artists": ["artists"],
+    },
+    "recently_played.csv": {
+        "track_id": ["track_id", "track.id"],
+        "track_name": ["track_name", "track.name"],
+        "artists": ["artists", "track.artists"],
+    },
+    "saved_tracks.csv": {
+        "track_id": ["track_id", "track.id"],
+        "track_name": ["track_name", "track.name"],
+        "artists": ["artists", "track.artists"],
+    },
+    "playlist_tracks_top3.csv": {
+        "track_id": ["track_id"],
+        "track_name": ["track_name"],
+        "artists": ["artists"],
+    },
+}
+
+OUTPUT_COLUMNS = ["track_id", "track_name", "artists"]
+
+STATE_FILE = "state.json"
+
+# Quoted items of a stringified Python list: ['A', "Guns N' Roses"].
+_LIST_ITEM = r"""'([^']*)'|"([^"]*)\""""
+
+
+def flatten_artists(values: pd.Series) -> pd.Series:
+
+    # Stringified lists become "A, B"; everything else is left as is.
+    text = values.astype("string")
+    stripped = text.str.strip()
+    is_list = stripped.str.startswith("[") & stripped.str.endswith("]")
+    if not is_list.fillna(False).any():
+        return text
+
+    inner = stripped[is_list.fillna(False)].str.slice(1, -1)
+    items = inner.str.extractall(_LIST_ITEM)
+    joined = (
+        items[0].fillna(items[1])
+        .groupby(level=0).agg(", ".join)
+    )
+    out = text.copy()
+    out.loc[joined.index] = joined
+    empty = inner.index[inner.str.strip() == ""]
+    out.loc[empty] = ""
+    return out
+
+
+def read_source(path: Path, roles: Dict[str, List[str]]) -> pd.DataFrame:
+
+    available = set(pd.read_csv(path, nrows=0).columns)
+    mapping = {}
+    for role, candidates in roles.items():
+        found = next((c for c in candidates if c in available), None)
+        if found is None:
+            raise KeyError(f"{path.name} has no column for {role} (tried {candidates})")
+        mapping[found] = role
+
+    df = pd.read_csv(path, usecols=list(mapping), dtype="string").rename(columns=mapping)
+    count_io("rows_in", len(df))
+    df["artists"] = flatten_artists(df["artists"])
+    return df[OUTPUT_COLUMNS].dropna(subset=["track_id"])
+
+
+def read_typed(path: Path) -> pd.DataFrame:
+
+    # The columnar copy keeps string dtypes; a bare CSV needs them spelled out.
+    sidecar = columnar_path(path)
+    if sidecar is not None and sidecar.exists():
+        return read_df_csv(path)
+    return read_df_csv(path, dtype="string")
+
+
+def load_state(state_path: Path) -> Dict[str, str]:
+
+    if not state_path.exists():
+        return {}
+    with state_path.open("r", encoding="utf-8") as f:
+        return json.load(f).get("sources", {})
+
+
+def save_state(state_path: Path, sources: Dict[str, str]) -> None:
+
+    ensure_dir(state_path)
+    with state_path.open("w", encoding="utf-8") as f:
+        json.dump({"sources": sources}, f, indent=2)
+
+
+def assemble_wrapped_tracks(
+    interim_dir: Path,
+    out_path: Optional[Path] = None,
+    full: bool = False
+) -> pd.DataFrame:
+
+    out_path = out_path or interim_dir / "wrapped_tracks.csv"
+    cache_dir = interim_dir / "wrapped_tracks_sources"
+    state_path = cache_dir / STATE_FILE
+    previous = {} if full else load_state(state_path)
+
+    signatures: Dict[str, str] = {}
+    frames = []
+    refreshed = 0
+    for fname, roles in SOURCES.items():
+        path = interim_dir / fname
+        if not path.exists():
+            logger.warning("Missing %s, skipping.", path)
+            continue
+        signatures[fname] = file_signature(path)
+
+        # Each source is normalized once per change and cached on its own,
+        # so an edit to one file does not re-parse the others.
+        cached = cache_dir / fname
+        if previous.get(fname) == signatures[fname] and cached.exists():
+            df = read_typed(cached)
+            count_io("cache_hits")
+        else:
+            df = read_source(path, roles)
+            save_df_csv(df, cached)
+            refreshed += 1
+        frames.append(df)
+
+    if not frames:
+        raise RuntimeError("No interim track files found!")
+
+    if refreshed == 0 and signatures == previous and out_path.exists():
+        logger.info("Sources unchanged since last run; keeping %s", out_path)
+        return read_typed(out_path)
+
+    wrapped = (
+        pd.concat(frames, ignore_index=True)
+        .drop_duplicates(subset=["track_id"])
+        .astype("string")
+        .reset_index(drop=True)
+    )
+    save_df_csv(wrapped, out_path)
+    save_state(state_path, signatures)
+    logger.info(
+        "Wrote %d unique tracks to %s (%d of %d sources re-read)",
+        len(wrapped), out_path, refreshed, len(frames)
+    )
+    return wrapped
+
+
+def main(full: bool = False) -> pd.DataFrame:
+    root = get_project_root()
+    interim_dir = root / "data" / "interim"
+    return assemble_wrapped_tracks(interim_dir, full=full)
+
+
+if __name__ == "__main__":
+    main()
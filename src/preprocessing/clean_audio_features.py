@@ -1,9 +1,13 @@
+import argparse
 import logging
+import numpy as np
 import pandas as pd
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
-from src.preprocessing.utils import get_project_root, read_json_dir, save_df_csv
+from src.preprocessing.schemas import SCHEMAS, read_dataset
+from src.preprocessing.utils import DataFrameAppender, count_io, get_project_root, save_df_csv
+from src.data_ingestion.feature_store import AudioFeatureStore
 
 
 logging.basicConfig(
@@ -13,17 +17,43 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+DEFAULT_CHUNKSIZE = 100_000
+
+AUDIO_COLS = [
+    "danceability", "energy", "key", "loudness", "mode",
+    "speechiness", "acousticness", "instrumentalness",
+    "liveness", "valence", "tempo", "duration_ms"
+]
+
+# Compact dtypes used by the chunked path. They are fixed for the whole
+# run so every chunk appends to the same Parquet schema; integer values that
+# are non-integral or out of range become NA.
+CHUNK_DTYPES = {
+    "danceability": "float32",
+    "energy": "float32",
+    "loudness": "float32",
+    "speechiness": "float32",
+    "acousticness": "float32",
+    "instrumentalness": "float32",
+    "liveness": "float32",
+    "valence": "float32",
+    "tempo": "float32",
+    "key": "Int8",
+    "mode": "Int8",
+    "time_signature": "Int8",
+    "popularity": "Int8",
+    "duration_ms": "Int32",
+}
+
+CATEGORICAL_COLS = ["track_genre", "genre"]
+
+
 def clean_audio_features(df: pd.DataFrame) -> pd.DataFrame:
     
     df = df.copy()
 
 
-    audio_cols = [
-        "danceability", "energy", "key", "loudness", "mode",
-        "speechiness", "acousticness", "instrumentalness",
-        "liveness", "valence", "tempo", "duration_ms"
-    ]
-    for col in audio_cols:
+    for col in AUDIO_COLS:
         if col in df.columns:
             df[col] = pd.to_numeric(df[col], errors="coerce")
 
@@ -32,37 +62,113 @@ def clean_audio_features(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
-def main():
+def downcast_audio_features(df: pd.DataFrame) -> pd.DataFrame:
+    
+    for col, dtype in CHUNK_DTYPES.items():
+        if col not in df.columns:
+            continue
+        values = pd.to_numeric(df[col], errors="coerce")
+        if dtype != "float32":
+            info = np.iinfo(dtype.lower())
+            bad = values.notna() & ~((values % 1 == 0) & values.between(info.min, info.max))
+            if bad.any():
+                logger.warning("Setting %d invalid %s values to NA", int(bad.sum()), col)
+                values = values.mask(bad)
+        df[col] = values.astype(dtype)
+    for col in CATEGORICAL_COLS:
+        if col in df.columns:
+            df[col] = df[col].astype("category")
+    return df
+
+
+def _id_hashes(ids: pd.Series) -> np.ndarray:
+    return pd.util.hash_pandas_object(ids.astype(str), index=False).to_numpy()
+
+
+def clean_audio_features_chunked(
+    csv_path: Path,
+    out_path: Path,
+    chunksize: int = DEFAULT_CHUNKSIZE
+) -> int:
+    
+    # Track ids seen so far are kept as a sorted array of 64-bit hashes
+    # (8 bytes per id) rather than a set of Python strings.
+    seen = np.empty(0, dtype=np.uint64)
+    n_in = 0
+    with DataFrameAppender(out_path) as out:
+        for chunk in SCHEMAS["track_pool"].read(csv_path, chunksize=chunksize):
+            n_in += len(chunk)
+            count_io("rows_in", len(chunk))
+            if "id" in chunk.columns:
+                chunk = chunk.rename(columns={"id": "track_id"})
+            elif "track_id" not in chunk.columns:
+                raise KeyError(
+                    f"Couldn't find identifier column in {csv_path}. "
+                    f"Available columns: {chunk.columns.tolist()}"
+                )
+            chunk = chunk.dropna(subset=["track_id"])
+
+            hashes = _id_hashes(chunk["track_id"])
+            keep = ~pd.Series(hashes).duplicated().to_numpy()
+            if len(seen):
+                pos = np.minimum(np.searchsorted(seen, hashes), len(seen) - 1)
+                keep &= seen[pos] != hashes
+            chunk = chunk[keep]
+            # Sorted insert: one linear copy of seen per chunk, not a re-sort.
+            new = np.sort(hashes[keep])
+            seen = np.insert(seen, np.searchsorted(seen, new), new)
+
+            out.write(downcast_audio_features(chunk))
+            logger.debug("Processed %d rows, %d unique so far", n_in, len(seen))
+    logger.info("Cleaned %d of %d rows from %s in chunks of %d",
+                out.rows, n_in, csv_path, chunksize)
+    return out.rows
+
+
+def main(chunksize: Optional[int] = DEFAULT_CHUNKSIZE):
     project_root = get_project_root()
 
 
     raw_json_dir = project_root / "data" / "raw" / "spotify_api"
     csv_fallback = project_root / "data" / "raw" / "full_track_pool" / "dataset.csv"
+    store_path = raw_json_dir / "audio_features.sqlite"
+    out_path = project_root / "data" / "interim" / "audio_features.csv"
 
 
-    json_files = list(raw_json_dir.glob("audio_features_*.json"))
-    if json_files:
-        logger.info("Found %d audio_features JSON files. Loading...", len(json_files))
-
-        records = read_json_dir(raw_json_dir, pattern="audio_features_*.json")
-        df_json = pd.DataFrame(records)
+    json_files = list(raw_json_dir.glob("audio_features_*"))
+    if json_files or store_path.exists():
+        # Snapshots are folded into the keyed feature store once; after that
+        # only new snapshot files are parsed.
+        store = AudioFeatureStore(store_path)
+        store.import_json_dir(raw_json_dir, pattern="audio_features_*")
+        df_json = store.to_frame()
+        count_io("rows_in", len(df_json))
+        store.close()
+        logger.info("Loaded %d tracks from audio feature store", len(df_json))
 
 
-        if not df_json.empty and "id" in df_json.columns:
+        if not df_json.empty:
             df_raw = df_json
             logger.info("Using %d rows from JSON source", len(df_raw))
         else:
             logger.warning(
-                "JSON source missing 'id' or empty—falling back to CSV: %s",
+                "Feature store is empty—falling back to CSV: %s",
                 csv_fallback
             )
-            df_raw = pd.read_csv(csv_fallback)
+            df_raw = None
     else:
         logger.warning(
             "No audio_features JSON found at %s; reading CSV fallback: %s",
             raw_json_dir, csv_fallback
         )
-        df_raw = pd.read_csv(csv_fallback)
+        df_raw = None
+
+    if df_raw is None:
+        # The full track pool can be far larger than memory; stream it.
+        if chunksize:
+            clean_audio_features_chunked(csv_fallback, out_path, chunksize)
+            return
+        df_raw = read_dataset("track_pool", csv_fallback)
 
 
     if "id" in df_raw.columns:
@@ -83,10 +189,15 @@ def main():
     df_clean = clean_audio_features(df_raw)
 
 
-    out_path = project_root / "data" / "interim" / "audio_features.csv"
     save_df_csv(df_clean, out_path)
     logger.info("Saved cleaned audio features to %s", out_path)
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Clean raw audio features")
+    parser.add_argument(
+        "--chunksize", type=int, default=DEFAULT_CHUNKSIZE,
+        help="Rows per chunk when streaming the CSV track pool (0 loads it at once)"
+    )
+    args = parser.parse_args()
+    main(chunksize=args.chunksize)
@@ -0,0 +1,142 @@
+import re
+import time
+import logging
+from collections import defaultdict
+from difflib import SequenceMatcher
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_ARTIST_THRESHOLD = 0.85
+DEFAULT_TRACK_THRESHOLD = 0.80
+
+# Artist tokens shared by more candidates than this ("the", "band", ...) are
+# too common to narrow anything down and are skipped when blocking.
+DEFAULT_MAX_BLOCK_SIZE = 2000
+
+_TITLE_NOISE = [
+    r"\s*[\(\[][^\)\]]*[\)\]]",                      # (feat. X), [Remastered]
+    r"\s+-\s+.*$",                                     # Song - 2011 Remaster
+    r"\s+(?:feat\.?|ft\.?|featuring)\s.*$",           # Song feat. X
+]
+
+_ARTIST_SEPARATORS = re.compile(
+    r"\s*(?:,|;|&|\s(?:feat\.?|ft\.?|featuring|x|and)\s)\s*", re.IGNORECASE
+)
+
+
+def strip_title_noise(titles: pd.Series) -> pd.Series:
+
+    out = titles.astype(str).fillna("")
+    for pattern in _TITLE_NOISE:
+        out = out.str.replace(pattern, "", regex=True, flags=re.IGNORECASE)
+    return out
+
+
+def primary_artist(artists: pd.Series) -> pd.Series:
+
+    return (
+        artists.astype(str).fillna("")
+        .str.split(_ARTIST_SEPARATORS, n=1, regex=True)
+        .str[0]
+    )
+
+
+class FuzzyMatcher:
+
+
+    def __init__(
+        self,
+        artist_threshold: float = DEFAULT_ARTIST_THRESHOLD,
+        track_threshold: float = DEFAULT_TRACK_THRESHOLD,
+        max_block_size: int = DEFAULT_MAX_BLOCK_SIZE
+    ):
+        self.artist_threshold = artist_threshold
+        self.track_threshold = track_threshold
+        self.max_block_size = max_block_size
+        self._artists: List[str] = []
+        self._tracks: List[str] = []
+        self._blocks: Dict[str, List[int]] = {}
+        self.report: Dict[str, Any] = {}
+
+    def fit(self, artists_clean: pd.Series, tracks_clean: pd.Series) -> "FuzzyMatcher":
+
+        # Inverted index from artist token to candidate positions; only
+        # candidates sharing a token with the query are ever scored.
+        self._artists = artists_clean.astype(str).tolist()
+        self._tracks = tracks_clean.astype(str).tolist()
+        blocks: Dict[str, List[int]] = defaultdict(list)
+        for pos, artist in enumerate(self._artists):
+            for token in set(artist.split()):
+                blocks[token].append(pos)
+        self._blocks = dict(blocks)
+        logger.info(
+            "Fuzzy matcher indexed %d candidates under %d artist tokens",
+            len(self._artists), len(self._blocks)
+        )
+        return self
+
+    def _candidates(self, artist: str) -> List[int]:
+        postings = [self._blocks.get(token, []) for token in set(artist.split())]
+        postings = [p for p in postings if p]
+        narrow = [p for p in postings if len(p) <= self.max_block_size]
+        # A name made only of common tokens still gets its smallest block.
+        if not narrow and postings:
+            narrow = [min(postings, key=len)]
+        return sorted(set().union(*narrow)) if narrow else []
+
+    def _score(self, query: str, candidate: str, threshold: float) -> float:
+        if query == candidate:
+            return 1.0
+        matcher = SequenceMatcher(None, query, candidate, autojunk=False)
+        # The cheap upper bounds rule most candidates out before ratio().
+        if matcher.real_quick_ratio() < threshold or matcher.quick_ratio() < threshold:
+            return 0.0
+        return matcher.ratio()
+
+    def match_one(self, artist: str, track: str) -> Tuple[int, float, int]:
+
+        best, best_score, scored = -1, 0.0, 0
+        for pos in self._candidates(artist):
+            scored += 1
+            a_score = self._score(artist, self._artists[pos], self.artist_threshold)
+            if a_score < self.artist_threshold:
+                continue
+            t_score = self._score(track, self._tracks[pos], self.track_threshold)
+            if t_score < self.track_threshold:
+                continue
+            score = (a_score + t_score) / 2
+            if score > best_score:
+                best, best_score = pos, score
+        return best, best_score, scored
+
+    def match(self, artists_clean: pd.Series, tracks_clean: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+
+        start = time.perf_counter()
+        positions = np.full(len(artists_clean), -1, dtype=np.int64)
+        scores = np.zeros(len(artists_clean), dtype=np.float64)
+        scored = 0
+        for i, (artist, track) in enumerate(zip(artists_clean.astype(str), tracks_clean.astype(str))):
+            positions[i], scores[i], n = self.match_one(artist, track)
+            scored += n
+
+        matched = int((positions >= 0).sum())
+        self.report = {
+            "queries": len(positions),
+            "matched": matched,
+            "match_rate": round(matched / len(positions), 4) if len(positions) else 0.0,
+            "candidates_scored": scored,
+            "candidate_pool": len(self._artists),
+            "seconds": round(time.perf_counter() - start, 4),
+        }
+        logger.info(
+            "Fuzzy matched %d/%d rows (%.1f%%) scoring %d candidates in %.3fs",
+            matched, len(positions), 100 * self.report["match_rate"],
+            scored, self.report["seconds"]
+        )
+        return positions, scores
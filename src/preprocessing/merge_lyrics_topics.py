@@ -1,18 +1,38 @@
+import argparse
 import logging
 import re
+import numpy as np
 import pandas as pd
 from pathlib import Path
+from typing import List, Optional
 
+from src.preprocessing.schemas import read_dataset
 from src.preprocessing.utils import (
     get_project_root,
+    count_io,
     ensure_dir,
+    file_signature,
     save_df_csv,
     read_df_csv
 )
+from src.preprocessing.fuzzy_match import (
+    DEFAULT_ARTIST_THRESHOLD,
+    DEFAULT_TRACK_THRESHOLD,
+    FuzzyMatcher,
+    primary_artist,
+    strip_title_noise
+)
+from src.preprocessing.topic_index import KEY_COLUMN, TopicIndex, topic_keys
 
 logger = logging.getLogger(__name__)
 
 
+NON_TOPIC_COLS = {"artist", "track", "artist_clean", "track_clean", "release_year", "genre", "lyrics"}
+
+# Label value (e.g. main_topic) for base rows with no topic match.
+UNMATCHED_LABEL = "unknown"
+
+
 def clean_text(s: str) -> str:
     
     if pd.isna(s):
@@ -22,10 +42,31 @@ def clean_text(s: str) -> str:
     return re.sub(r"\s+", " ", s).strip()
 
 
-def load_lyrics_topics(raw_dir: Path) -> pd.DataFrame:
+def clean_text_series(values: pd.Series) -> pd.Series:
+    
+    # Column-wide equivalent of values.astype(str).apply(clean_text). Only
+    # [a-z0-9 ] survive the first replace, so runs of spaces are the only
+    # whitespace left to collapse.
+    return (
+        values.astype(str)
+        .fillna("")
+        .str.lower()
+        .str.replace(r"[^a-z0-9 ]+", "", regex=True)
+        .str.replace(r" {2,}", " ", regex=True)
+        .str.strip()
+    )
+
+
+def load_lyrics_topics(raw_dir: Path, with_lyrics: bool = True) -> pd.DataFrame:
     
     path = raw_dir / "tcc_ceds_music.csv"
-    df = read_df_csv(path)
+    # Plain string columns: unmatched labels are filled with UNMATCHED_LABEL
+    # after the merge, which a categorical column would reject.
+    df = read_dataset(
+        "lyrics_topics", path,
+        exclude=() if with_lyrics else ["lyrics"],
+        categoricals=False
+    )
     logger.info("Loaded lyrics-topic data (%d rows)", len(df))
     # Standardize column names
     df = df.rename(columns={
@@ -37,41 +78,121 @@ def load_lyrics_topics(raw_dir: Path) -> pd.DataFrame:
     return df
 
 
+def load_topic_index(raw_dir: Path, index_path: Path) -> TopicIndex:
+    
+    # The index is rebuilt only when tcc_ceds_music.csv changes on disk.
+    source = raw_dir / "tcc_ceds_music.csv"
+    signature = file_signature(source)
+    index = TopicIndex(index_path)
+    if index.is_current(signature):
+        count_io("cache_hits")
+        logger.info("Using topic index %s", index_path)
+        return index
+
+    # The lyrics text is the bulk of the file and is not part of the index.
+    df_topics = load_lyrics_topics(raw_dir, with_lyrics=False)
+    keys = topic_keys(clean_text_series(df_topics["artist"]), clean_text_series(df_topics["track"]))
+    topic_cols = [col for col in df_topics.columns if col not in NON_TOPIC_COLS]
+    index.rebuild(keys, df_topics[topic_cols], signature, names=df_topics[["artist", "track"]])
+    return index
+
+
+def fuzzy_keys(artists: pd.Series, tracks: pd.Series):
+    
+    # Looser keys than the exact join: first credited artist only, and
+    # titles without bracketed parts, " - Remaster" suffixes or feat. credits.
+    return (
+        clean_text_series(primary_artist(artists)),
+        clean_text_series(strip_title_noise(tracks))
+    )
+
+
+def fill_fuzzy_matches(
+    df_merged: pd.DataFrame,
+    unmatched: np.ndarray,
+    matcher: FuzzyMatcher,
+    artist_col: str,
+    track_col: str,
+    topic_cols: List[str],
+    df_topics: Optional[pd.DataFrame] = None,
+    topic_index: Optional[TopicIndex] = None
+) -> pd.DataFrame:
+    
+    names = topic_index.names() if topic_index is not None else df_topics[["artist", "track"]]
+    matcher.fit(*fuzzy_keys(names["artist"], names["track"]))
+
+    rows = np.flatnonzero(unmatched)
+    positions, _ = matcher.match(*fuzzy_keys(
+        df_merged[artist_col].iloc[rows], df_merged[track_col].iloc[rows]
+    ))
+    found = positions >= 0
+    if not found.any():
+        return df_merged
+
+    if topic_index is not None:
+        values = topic_index.rows(positions[found])
+    else:
+        values = df_topics[topic_cols].iloc[positions[found]].reset_index(drop=True)
+    for col in topic_cols:
+        df_merged.iloc[rows[found], df_merged.columns.get_loc(col)] = values[col].to_numpy()
+    return df_merged
+
+
 def merge_with_topics(
     df_base: pd.DataFrame,
-    df_topics: pd.DataFrame,
+    df_topics: Optional[pd.DataFrame] = None,
     artist_col: str = "artist",
-    track_col: str = "track"
+    track_col: str = "track",
+    topic_index: Optional[TopicIndex] = None,
+    matcher: Optional[FuzzyMatcher] = None
 ) -> pd.DataFrame:
     
 
     df_base = df_base.copy()
-    df_base["artist_clean"] = df_base[artist_col].astype(str).apply(clean_text)
-    df_base["track_clean"] = df_base[track_col].astype(str).apply(clean_text)
+    df_base[KEY_COLUMN] = topic_keys(
+        clean_text_series(df_base[artist_col]),
+        clean_text_series(df_base[track_col])
+    )
 
-    df_topics = df_topics.copy()
-    df_topics["artist_clean"] = df_topics["artist"].astype(str).apply(clean_text)
-    df_topics["track_clean"] = df_topics["track"].astype(str).apply(clean_text)
+    if topic_index is not None:
+        # Only the keys present in the base frame are read from disk.
+        topic_cols = topic_index.topic_columns
+        df_hits = topic_index.lookup(df_base[KEY_COLUMN])
+        df_hits[KEY_COLUMN] = df_hits[KEY_COLUMN].astype("int64")
+    elif df_topics is not None:
+        topic_cols = [col for col in df_topics.columns if col not in NON_TOPIC_COLS]
+        df_hits = df_topics[topic_cols].copy()
+        df_hits.insert(0, KEY_COLUMN, topic_keys(
+            clean_text_series(df_topics["artist"]),
+            clean_text_series(df_topics["track"])
+        ))
+    else:
+        raise ValueError("merge_with_topics needs df_topics or topic_index")
 
 
-    topic_cols = [
-        col for col in df_topics.columns
-        if col not in {"artist", "track", "artist_clean", "track_clean", "release_year", "genre", "lyrics"}
-    ]
+    df_merged = pd.merge(df_base, df_hits, on=KEY_COLUMN, how="left", indicator=True)
+    unmatched = (df_merged.pop("_merge") == "left_only").to_numpy()
+    logger.info("Exact key matches for %d/%d rows", len(df_merged) - unmatched.sum(), len(df_merged))
 
 
-    df_merged = pd.merge(
-        df_base,
-        df_topics[["artist_clean", "track_clean"] + topic_cols],
-        on=["artist_clean", "track_clean"],
-        how="left"
-    )
+    # Rows the exact join missed get a second, blocked fuzzy pass.
+    if matcher is not None and unmatched.any():
+        df_merged = fill_fuzzy_matches(
+            df_merged, unmatched, matcher, artist_col, track_col, topic_cols,
+            df_topics=df_topics if topic_index is None else None,
+            topic_index=topic_index
+        )
 
 
-    df_merged = df_merged.drop(columns=["artist_clean", "track_clean"])
+    df_merged = df_merged.drop(columns=[KEY_COLUMN])
 
 
-    df_merged[topic_cols] = df_merged[topic_cols].fillna(0)
+    # Unmatched rows score 0 on every topic; label columns such as
+    # main_topic get a string sentinel so they stay all-string.
+    numeric_cols = [c for c in topic_cols if pd.api.types.is_numeric_dtype(df_merged[c])]
+    label_cols = [c for c in topic_cols if c not in numeric_cols]
+    df_merged[numeric_cols] = df_merged[numeric_cols].fillna(0)
+    df_merged[label_cols] = df_merged[label_cols].fillna(UNMATCHED_LABEL)
 
     logger.info(
         "Merged base (%d rows) with topics; now has %d columns",
@@ -80,7 +201,11 @@ def merge_with_topics(
     return df_merged
 
 
-def main():
+def main(
+    fuzzy: bool = True,
+    artist_threshold: float = DEFAULT_ARTIST_THRESHOLD,
+    track_threshold: float = DEFAULT_TRACK_THRESHOLD
+):
     root = get_project_root()
     interim_dir = root / "data" / "interim"
     processed_dir = root / "data" / "processed"
@@ -94,19 +219,31 @@ def main():
 
 
     raw_lyrics_dir = root / "data" / "raw" / "dataset5_lyrics"
-    df_topics = load_lyrics_topics(raw_lyrics_dir)
+    topic_index = load_topic_index(raw_lyrics_dir, interim_dir / "topic_index.sqlite")
 
 
     df_enriched = merge_with_topics(
         df_base,
-        df_topics,
         artist_col="artists",
-        track_col="track_name"
+        track_col="track_name",
+        topic_index=topic_index,
+        matcher=FuzzyMatcher(artist_threshold, track_threshold) if fuzzy else None
     )
+    topic_index.close()
     out_path = processed_dir / "tracks_with_topics.csv"
     ensure_dir(out_path)
     save_df_csv(df_enriched, out_path)
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Merge wrapped tracks with lyric topics")
+    parser.add_argument("--no_fuzzy", action="store_true",
+                        help="Only use exact normalized artist/track matches")
+    parser.add_argument("--artist_threshold", type=float, default=DEFAULT_ARTIST_THRESHOLD)
+    parser.add_argument("--track_threshold", type=float, default=DEFAULT_TRACK_THRESHOLD)
+    args = parser.parse_args()
+    main(
+        fuzzy=not args.no_fuzzy,
+        artist_threshold=args.artist_threshold,
+        track_threshold=args.track_threshold
+    )
@@ -0,0 +1,220 @@
+import logging
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import pandas as pd
+
+from src.preprocessing.utils import count_io
+
+try:
+    import pyarrow.csv as pa_csv
+except ImportError:
+    pa_csv = None
+
+
+logger = logging.getLogger(__name__)
+
+
+class SchemaError(ValueError):
+    pass
+
+
+AUDIO_DTYPES: Dict[str, str] = {
+    "danceability": "float32",
+    "energy": "float32",
+    "key": "Int8",
+    "loudness": "float32",
+    "mode": "Int8",
+    "speechiness": "float32",
+    "acousticness": "float32",
+    "instrumentalness": "float32",
+    "liveness": "float32",
+    "valence": "float32",
+    "tempo": "float32",
+    "duration_ms": "Int32",
+    "time_signature": "Int8",
+}
+
+SPOTIFY_REF_DTYPES: Dict[str, str] = {
+    "id": "str",
+    "uri": "str",
+    "track_href": "str",
+    "analysis_url": "str",
+    "type": "str",
+}
+
+LYRIC_TOPIC_COLS = [
+    "dating", "violence", "world/life", "night/time", "shake the audience",
+    "family/gospel", "romantic", "communication", "obscene", "music",
+    "movement/places", "light/visual perceptions", "family/spiritual",
+    "like/girls", "sadness", "feelings",
+]
+
+
+class DatasetSchema:
+
+
+    def __init__(
+        self,
+        name: str,
+        dtypes: Dict[str, str],
+        required: Iterable[str],
+        categoricals: Iterable[str] = ()
+    ):
+        # dtypes covers every known column; only `required` must be present,
+        # so older exports with a column or two missing still load. Unknown
+        # extra columns are read with type inference.
+        self.name = name
+        self.dtypes = dtypes
+        self.required = list(required)
+        self.categoricals = list(categoricals)
+
+    def validate(self, header: List[str], path: Path) -> None:
+
+        missing = [c for c in self.required if c not in header]
+        if missing:
+            raise SchemaError(
+                f"{path} does not match the {self.name} schema; missing columns: {missing}"
+            )
+        dupes = sorted({c for c in header if header.count(c) > 1})
+        if dupes:
+            raise SchemaError(f"{path} has duplicate columns: {dupes}")
+
+    def read_dtypes(self, columns: Iterable[str], categoricals: bool = True) -> Dict[str, str]:
+
+        dtypes = {c: self.dtypes[c] for c in columns if c in self.dtypes}
+        if categoricals:
+            dtypes.update({c: "category" for c in self.categoricals if c in dtypes})
+        return dtypes
+
+    def read(
+        self,
+        path: Path,
+        columns: Optional[List[str]] = None,
+        exclude: Iterable[str] = (),
+        categoricals: bool = True,
+        **kwargs
+    ) -> pd.DataFrame:
+
+        # The header is checked before any rows are parsed, so a wrong or
+        # truncated file fails in milliseconds instead of deep in a step.
+        header = list(pd.read_csv(path, nrows=0).columns)
+        self.validate(header, path)
+        if columns is not None:
+            unknown = [c for c in columns if c not in header]
+            if unknown:
+                raise SchemaError(f"{path} has no columns {unknown}")
+        skip = set(exclude)
+        usecols = [c for c in (columns if columns is not None else header) if c not in skip]
+        dtypes = self.read_dtypes(usecols, categoricals=categoricals)
+
+        if pa_csv is not None and not kwargs:
+            # pyarrow's multithreaded reader is much faster than the C parser
+            # on wide files. It is called directly rather than through
+            # engine="pyarrow" so the header names match pandas' (a blank
+            # index header is "Unnamed: 0") and quoted lyrics may span lines.
+            table = pa_csv.read_csv(
+                str(path),
+                read_options=pa_csv.ReadOptions(column_names=header, skip_rows=1),
+                parse_options=pa_csv.ParseOptions(newlines_in_values=True),
+                convert_options=pa_csv.ConvertOptions(
+                    include_columns=usecols, strings_can_be_null=True
+                )
+            )
+            # Text columns already arrive as strings with nulls intact;
+            # astype("str") would turn those nulls into 'None' before pandas 3.
+            df = table.to_pandas().astype(
+                {c: t for c, t in dtypes.items() if t != "str"}
+            )
+        else:
+            # Chunked reads (chunksize=...) and other parser options need the
+            # C parser; the caller counts rows per chunk.
+            result = pd.read_csv(path, usecols=usecols, dtype=dtypes, **kwargs)
+            if not isinstance(result, pd.DataFrame):
+                return result
+            df = result[usecols]
+        count_io("rows_in", len(df))
+        return df
+
+
+SCHEMAS: Dict[str, DatasetSchema] = {
+    # data/raw/genres_v2/genres_v2.csv
+    "genres_v2": DatasetSchema(
+        "genres_v2",
+        dtypes={
+            **AUDIO_DTYPES,
+            **SPOTIFY_REF_DTYPES,
+            "genre": "str",
+            "song_name": "str",
+            "Unnamed: 0": "Int32",
+            "title": "str",
+        },
+        required=[
+            "danceability", "energy", "loudness", "speechiness", "acousticness",
+            "instrumentalness", "liveness", "valence", "tempo", "genre",
+        ],
+        categoricals=["genre"],
+    ),
+    # data/raw/full_track_pool/dataset.csv
+    "track_pool": DatasetSchema(
+        "track_pool",
+        dtypes={
+            **AUDIO_DTYPES,
+            "Unnamed: 0": "Int32",
+            "track_id": "str",
+            "artists": "str",
+            "album_name": "str",
+            "track_name": "str",
+            "popularity": "Int8",
+            "explicit": "boolean",
+            "track_genre": "str",
+        },
+        required=["track_id"],
+        categoricals=["track_genre"],
+    ),
+    # data/raw/dataset5_lyrics/tcc_ceds_music.csv. Topic scores stay float64
+    # because they are copied verbatim into processed CSVs.
+    "lyrics_topics": DatasetSchema(
+        "lyrics_topics",
+        dtypes={
+            "Unnamed: 0": "Int32",
+            "artist_name": "str",
+            "track_name": "str",
+            "release_date": "Int16",
+            "genre": "str",
+            "lyrics": "str",
+            "len": "Int32",
+            **{c: "float64" for c in LYRIC_TOPIC_COLS},
+            "topic": "str",
+            "age": "float64",
+        },
+        required=["artist_name", "track_name", "lyrics"],
+        categoricals=["genre", "topic"],
+    ),
+    # data/raw/popularity_splits/{high,low}_popularity_spotify_data.csv
+    "popularity_split": DatasetSchema(
+        "popularity_split",
+        dtypes={
+            **AUDIO_DTYPES,
+            **SPOTIFY_REF_DTYPES,
+            "track_id": "str",
+            "track_name": "str",
+            "track_artist": "str",
+            "track_popularity": "Int8",
+            "track_album_id": "str",
+            "track_album_name": "str",
+            "track_album_release_date": "str",
+            "playlist_id": "str",
+            "playlist_name": "str",
+            "playlist_genre": "str",
+            "playlist_subgenre": "str",
+        },
+        required=["energy", "playlist_genre"],
+        categoricals=["playlist_genre", "playlist_subgenre", "playlist_name"],
+    ),
+}
+
+
+def read_dataset(name: str, path: Path, **kwargs) -> pd.DataFrame:
+
+    return SCHEMAS[name].read(path, **kwargs)
@@ -0,0 +1,145 @@
+import sqlite3
+import threading
+import logging
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.preprocessing.utils import file_signature
+
+
+logger = logging.getLogger(__name__)
+
+
+KEY_COLUMN = "topic_key"
+
+# Bumped whenever the on-disk layout changes so older indexes are rebuilt.
+INDEX_VERSION = "2"
+
+
+def topic_keys(artist_clean: pd.Series, track_clean: pd.Series) -> np.ndarray:
+
+    # Normalized keys only hold [a-z0-9 ], so "\x1f" cannot occur inside
+    # either part. SQLite integers are signed, hence the int64 view.
+    joined = (artist_clean.astype(str) + "\x1f" + track_clean.astype(str)).to_numpy(dtype=object)
+    return pd.util.hash_array(joined).view(np.int64)
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+class TopicIndex:
+
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+        )
+
+    def _meta(self, key: str) -> Optional[str]:
+        row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def signature(self) -> Optional[str]:
+
+        with self._lock:
+            return self._meta("source_signature")
+
+    def is_current(self, signature: str) -> bool:
+
+        with self._lock:
+            version = self._meta("index_version")
+        return version == INDEX_VERSION and self.signature() == signature
+
+    @property
+    def topic_columns(self) -> List[str]:
+        with self._lock:
+            names = self._meta("topic_columns")
+        return names.split("\x1f") if names else []
+
+    def rebuild(
+        self,
+        keys: np.ndarray,
+        df_topics: pd.DataFrame,
+        signature: str,
+        names: Optional[pd.DataFrame] = None
+    ) -> int:
+
+        # Row i of the source lands at rowid i + 1 in both tables; the names
+        # table (raw artist/track) feeds fuzzy matching of unmatched rows.
+        frame = df_topics.reset_index(drop=True)
+        frame.insert(0, KEY_COLUMN, keys)
+        with self._lock:
+            self._conn.execute("DROP TABLE IF EXISTS topics")
+            self._conn.execute("DROP TABLE IF EXISTS names")
+            frame.to_sql("topics", self._conn, index=False)
+            self._conn.execute(f"CREATE INDEX idx_topics_key ON topics ({KEY_COLUMN})")
+            if names is not None:
+                names[["artist", "track"]].reset_index(drop=True).to_sql(
+                    "names", self._conn, index=False
+                )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                [
+                    ("source_signature", signature),
+                    ("topic_columns", "\x1f".join(df_topics.columns)),
+                    ("index_version", INDEX_VERSION),
+                ]
+            )
+            self._conn.commit()
+        logger.info("Built topic index with %d rows at %s", len(frame), self.path)
+        return len(frame)
+
+    def lookup(self, keys: Iterable[int]) -> pd.DataFrame:
+
+        columns = [KEY_COLUMN] + self.topic_columns
+        select = ", ".join(_quote(c) for c in columns)
+        ids = [int(k) for k in dict.fromkeys(keys)]
+        frames = []
+        with self._lock:
+            # Stay well below SQLite's bound-parameter limit.
+            for start in range(0, len(ids), 500):
+                chunk = ids[start:start + 500]
+                marks = ",".join("?" * len(chunk))
+                frames.append(pd.read_sql_query(
+                    f"SELECT {select} FROM topics WHERE {KEY_COLUMN} IN ({marks}) ORDER BY rowid",
+                    self._conn, params=chunk
+                ))
+        if not frames:
+            return pd.DataFrame(columns=columns)
+        return pd.concat(frames, ignore_index=True)
+
+    def names(self) -> pd.DataFrame:
+
+        with self._lock:
+            return pd.read_sql_query(
+                "SELECT artist, track FROM names ORDER BY rowid", self._conn
+            )
+
+    def rows(self, positions: Iterable[int]) -> pd.DataFrame:
+
+        columns = self.topic_columns
+        select = ", ".join(_quote(c) for c in columns)
+        wanted = [int(p) + 1 for p in positions]
+        found = {}
+        with self._lock:
+            for start in range(0, len(wanted), 500):
+                chunk = wanted[start:start + 500]
+                marks = ",".join("?" * len(chunk))
+                for row in self._conn.execute(
+                    f"SELECT rowid, {select} FROM topics WHERE rowid IN ({marks})", chunk
+                ):
+                    found[row[0]] = row[1:]
+        # Returned in the order asked for, repeats included.
+        return pd.DataFrame([found[r] for r in wanted], columns=columns)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -1,12 +1,64 @@
+import io
+import os
+import gzip
+import hashlib
+import importlib.util
 import json
 import pandas as pd
 import logging
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Any, List, Dict
+from typing import Any, List, Dict, Iterable, Iterator, IO, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
 
 logger = logging.getLogger(__name__)
 
 
+NDJSON_SUFFIXES = (".ndjson", ".jsonl")
+
+HASH_BLOCK_SIZE = 1 << 20
+
+# Below this many files a process pool costs more than it saves.
+PARALLEL_MIN_FILES = 16
+
+# Columnar copy written next to every CSV saved through save_df_csv:
+# "parquet", "feather", "csv" (none) or "auto" (parquet when pyarrow exists).
+STORAGE_FORMAT = os.getenv("WRAPPED_STORAGE_FORMAT", "auto")
+
+# Per-process tallies of rows read/written through the helpers below and
+# of cache hits reported by pipeline stages; the pipeline runner snapshots
+# them around each step.
+IO_COUNTERS: Counter = Counter()
+
+_STORAGE_BACKENDS = {
+    "parquet": (
+        ".parquet",
+        lambda df, path: df.to_parquet(path, index=False),
+        lambda path, columns: pd.read_parquet(path, columns=columns),
+    ),
+    "feather": (
+        ".feather",
+        lambda df, path: df.to_feather(path),
+        lambda path, columns: pd.read_feather(path, columns=columns),
+    ),
+}
+
+
+def count_io(name: str, n: int = 1) -> None:
+    
+    IO_COUNTERS[name] += n
+
+
 def get_project_root() -> Path:
     
     return Path(__file__).resolve().parents[2]
@@ -20,30 +72,369 @@ def ensure_dir(path: Path) -> None:
         logger.info("Created directory %s", parent)
 
 
+def file_signature(path: Path) -> str:
+    
+    stat = Path(path).stat()
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def sha256_file(path: Path) -> str:
+
+    digest = hashlib.sha256()
+    with Path(path).open("rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def loads_json(data) -> Any:
+    
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
 def read_json_file(path: Path) -> Any:
     
-    with path.open("r", encoding="utf-8") as f:
-        return json.load(f)
+    return loads_json(path.read_bytes())
+
+
+def open_text(path: Path, mode: str = "r") -> IO[str]:
+    
+    name = path.name
+    if name.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    if name.endswith(".zst"):
+        if zstandard is None:
+            raise ImportError(f"Reading or writing {path} requires the 'zstandard' package")
+        if mode == "r":
+            raw = zstandard.ZstdDecompressor().stream_reader(path.open("rb"))
+        else:
+            raw = zstandard.ZstdCompressor(level=10).stream_writer(path.open(mode + "b"))
+        return io.TextIOWrapper(raw, encoding="utf-8")
+    return path.open(mode, encoding="utf-8")
+
+
+def is_ndjson(path: Path) -> bool:
+    
+    name = path.name
+    for compressed in (".gz", ".zst"):
+        if name.endswith(compressed):
+            name = name[:-len(compressed)]
+    return name.endswith(NDJSON_SUFFIXES)
+
+
+class NDJSONWriter:
+    
+
+    def __init__(self, path: Path, append: bool = False):
+        self.path = path
+        self.count = 0
+        ensure_dir(path)
+        self._f = open_text(path, "a" if append else "w")
+
+    def write(self, record: Any) -> None:
+        self._f.write(json.dumps(record, separators=(",", ":")))
+        self._f.write("\n")
+        self.count += 1
+
+    def close(self) -> None:
+        self._f.close()
+
+    def __enter__(self) -> "NDJSONWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def write_ndjson(records: Iterable[Any], path: Path, append: bool = False) -> int:
+    
+    with NDJSONWriter(path, append=append) as writer:
+        for record in records:
+            writer.write(record)
+    logger.info("Wrote %d records to %s", writer.count, path)
+    return writer.count
 
 
-def read_json_dir(dir_path: Path, pattern: str = "*.json") -> List[Any]:
+def read_json_lines(path: Path) -> Iterator[Any]:
     
-    data = []
-    for path in sorted(dir_path.glob(pattern)):
-        try:
-            data.append(read_json_file(path))
-        except Exception as e:
-            logger.error("Failed to read %s: %s", path, e, exc_info=True)
-    return data
+    with open_text(path) as f:
+        for line in f:
+            if line.strip():
+                yield loads_json(line)
+
+
+def _read_json_safe(path: Path) -> Tuple[Path, Any, Optional[str]]:
+    try:
+        return path, read_json_file(path), None
+    except Exception as e:
+        return path, None, f"{type(e).__name__}: {e}"
+
+
+def _resolve_workers(workers: Optional[int], n_files: int) -> int:
+    if workers is None:
+        workers = min(os.cpu_count() or 1, 8) if n_files >= PARALLEL_MIN_FILES else 1
+    return max(1, min(workers, n_files))
+
+
+def _iter_parsed(
+    paths: List[Path],
+    workers: Optional[int] = None
+) -> Iterator[Tuple[Path, Any, bool]]:
+    
+    # Yields (path, data, ok) in input order; failures are logged, not raised.
+    n_workers = _resolve_workers(workers, len(paths))
+    if n_workers <= 1:
+        for path in paths:
+            try:
+                yield path, read_json_file(path), True
+            except Exception as e:
+                logger.error("Failed to read %s: %s", path, e, exc_info=True)
+                yield path, None, False
+        return
+
+    # Keep a bounded window of files in flight so lazy callers stay lazy.
+    with ProcessPoolExecutor(max_workers=n_workers) as pool:
+        remaining = iter(paths)
+        window = deque()
+        for path in remaining:
+            window.append(pool.submit(_read_json_safe, path))
+            if len(window) >= 2 * n_workers:
+                break
+        while window:
+            path, data, error = window.popleft().result()
+            following = next(remaining, None)
+            if following is not None:
+                window.append(pool.submit(_read_json_safe, following))
+            if error is not None:
+                logger.error("Failed to read %s: %s", path, error)
+                yield path, None, False
+            else:
+                yield path, data, True
+
+
+def iter_json_dir(
+    dir_path: Path,
+    pattern: str = "*.json",
+    workers: Optional[int] = None
+) -> Iterator[Any]:
+    
+    for _, data, ok in _iter_parsed(sorted(dir_path.glob(pattern)), workers):
+        if ok:
+            yield data
+
+
+def iter_json_records(
+    dir_path: Path,
+    pattern: str = "*",
+    exclude: Iterable[str] = (),
+    workers: Optional[int] = None
+) -> Iterator[Any]:
+    
+    # Paging payloads ({"items": [...]}) and top-level lists are unwrapped so
+    # .json snapshots and NDJSON files yield the same per-record stream.
+    exclude = set(exclude)
+    paths = [
+        p for p in sorted(dir_path.glob(pattern))
+        if p.name not in exclude and (is_ndjson(p) or p.name.endswith(".json"))
+    ]
+    parsed = _iter_parsed([p for p in paths if not is_ndjson(p)], workers)
+    for path in paths:
+        if is_ndjson(path):
+            try:
+                yield from read_json_lines(path)
+            except Exception as e:
+                logger.error("Failed to read %s: %s", path, e, exc_info=True)
+            continue
+        _, blob, ok = next(parsed)
+        if not ok:
+            continue
+        if isinstance(blob, dict) and isinstance(blob.get("items"), list):
+            blob = blob["items"]
+        if isinstance(blob, list):
+            yield from (rec for rec in blob if rec is not None)
+        elif blob is not None:
+            yield blob
+
+
+def read_json_dir(
+    dir_path: Path,
+    pattern: str = "*.json",
+    workers: Optional[int] = None
+) -> List[Any]:
+    
+    return list(iter_json_dir(dir_path, pattern=pattern, workers=workers))
+
+
+def storage_format() -> Optional[str]:
+    
+    fmt = STORAGE_FORMAT.lower()
+    if fmt == "auto":
+        return "parquet" if importlib.util.find_spec("pyarrow") else None
+    if fmt == "csv":
+        return None
+    if fmt not in _STORAGE_BACKENDS:
+        raise ValueError(f"Unknown WRAPPED_STORAGE_FORMAT: {STORAGE_FORMAT}")
+    return fmt
+
+
+def columnar_path(csv_path: Path) -> Optional[Path]:
+    
+    fmt = storage_format()
+    if fmt is None:
+        return None
+    return csv_path.with_suffix(_STORAGE_BACKENDS[fmt][0])
+
+
+def fresh_columnar_path(csv_path: Path) -> Optional[Path]:
+    # A columnar copy older than its CSV was overwritten by something else.
+    sidecar = columnar_path(csv_path)
+    if sidecar is None or not sidecar.exists():
+        return None
+    if csv_path.exists() and sidecar.stat().st_mtime < csv_path.stat().st_mtime:
+        return None
+    return sidecar
+
+
+def _columnar_errors() -> Tuple[type, ...]:
+    try:
+        import pyarrow as pa
+    except ImportError:
+        return ()
+    return (pa.ArrowTypeError, pa.ArrowInvalid)
+
+
+def drop_columnar_copy(sidecar: Path, reason: Any) -> None:
+    
+    # The columnar copy only speeds up reads, so a frame it cannot hold (an
+    # object column mixing str and int, say) leaves the CSV on its own. Any
+    # partial or stale copy is removed so readers fall back to the CSV.
+    logger.warning("Skipped columnar copy %s: %s", sidecar, reason)
+    if sidecar.exists():
+        sidecar.unlink()
+
+
+def _write_columnar(df: pd.DataFrame, sidecar: Path) -> bool:
+    write = _STORAGE_BACKENDS[storage_format()][1]
+    try:
+        write(df, sidecar)
+    except _columnar_errors() as e:
+        drop_columnar_copy(sidecar, e)
+        return False
+    logger.debug("Saved columnar copy to %s", sidecar)
+    return True
 
 
 def save_df_csv(df: pd.DataFrame, out_path: Path, index: bool = False) -> None:
     
     ensure_dir(out_path)
     df.to_csv(out_path, index=index)
+    count_io("rows_out", len(df))
     logger.info("Saved DataFrame (%s) to %s", df.shape, out_path)
 
+    sidecar = columnar_path(out_path)
+    if sidecar is not None:
+        _write_columnar(df.reset_index() if index else df.reset_index(drop=True), sidecar)
+
+
+def append_df_csv(
+    df: pd.DataFrame,
+    out_path: Path,
+    full_frame: Optional[pd.DataFrame] = None
+) -> None:
+
+    # Adds rows to an existing CSV without rewriting it; df must have the
+    # file's columns in order. A columnar copy cannot be appended in place,
+    # so it is rewritten from full_frame when given and dropped otherwise.
+    df.to_csv(out_path, mode="a", header=False, index=False)
+    count_io("rows_out", len(df))
+    logger.info("Appended %d rows to %s", len(df), out_path)
+
+    sidecar = columnar_path(out_path)
+    if sidecar is None:
+        return
+    if full_frame is not None:
+        _write_columnar(full_frame.reset_index(drop=True), sidecar)
+    elif sidecar.exists():
+        sidecar.unlink()
+
+
+class DataFrameAppender:
+    
+
+    def __init__(self, out_path: Path):
+        ensure_dir(out_path)
+        self.out_path = out_path
+        self.rows = 0
+        self._header = True
+        self._parquet = None
+        # Parquet can be appended row group by row group; other columnar
+        # formats cannot, so their stale copy is removed instead.
+        sidecar = columnar_path(out_path)
+        self._sidecar = sidecar
+        if sidecar is not None and sidecar.exists():
+            sidecar.unlink()
+
+    def write(self, df: pd.DataFrame) -> None:
+        df.to_csv(self.out_path, mode="w" if self._header else "a",
+                  header=self._header, index=False)
+        self._header = False
+        self.rows += len(df)
+        count_io("rows_out", len(df))
+
+        if self._sidecar is not None and self._sidecar.suffix == ".parquet":
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            try:
+                table = pa.Table.from_pandas(df, preserve_index=False)
+                if self._parquet is None:
+                    self._parquet = pq.ParquetWriter(str(self._sidecar), table.schema)
+                else:
+                    table = table.cast(self._parquet.schema)
+                self._parquet.write_table(table)
+            except (pa.ArrowTypeError, pa.ArrowInvalid) as e:
+                # A chunk that does not fit the first chunk's schema ends the
+                # columnar copy; the CSV keeps being appended.
+                if self._parquet is not None:
+                    self._parquet.close()
+                    self._parquet = None
+                drop_columnar_copy(self._sidecar, e)
+                self._sidecar = None
+
+    def close(self) -> None:
+        if self._parquet is not None:
+            self._parquet.close()
+            self._parquet = None
+        logger.info("Saved %d rows to %s", self.rows, self.out_path)
+
+    def __enter__(self) -> "DataFrameAppender":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def read_df_columns(path: Path) -> List[str]:
+    
+    sidecar = fresh_columnar_path(path)
+    if sidecar is not None and sidecar.suffix == ".parquet":
+        import pyarrow.parquet as pq
+        return list(pq.read_schema(sidecar).names)
+    return list(pd.read_csv(path, nrows=0).columns)
+
 
-def read_df_csv(path: Path, **kwargs) -> pd.DataFrame:
+def read_df_csv(path: Path, columns: Optional[List[str]] = None, **kwargs) -> pd.DataFrame:
     
-    return pd.read_csv(path, **kwargs)
+    # The columnar copy keeps dtypes and reads only the requested columns;
+    # CSV-specific options (dtype=, parse_dates=, ...) force the CSV path.
+    sidecar = fresh_columnar_path(path) if not kwargs else None
+    if sidecar is not None:
+        read = _STORAGE_BACKENDS[storage_format()][2]
+        df = read(sidecar, columns)
+    else:
+        if columns is not None:
+            kwargs["usecols"] = columns
+        df = pd.read_csv(path, **kwargs)
+    count_io("rows_in", len(df))
+    return df
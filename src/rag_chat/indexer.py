@@ -7,7 +7,8 @@ from langchain.schema import Document
 from langchain.embeddings import OpenAIEmbeddings, SentenceTransformerEmbeddings
 from langchain.vectorstores import Chroma
 
-from src.preprocessing.utils import get_project_root, read_json_dir
+from src.preprocessing.utils import get_project_root
+from src.data_ingestion.recently_played_sync import iter_play_history
 
 
 DEFAULT_LOCAL_EMBED = "all-MiniLM-L6-v2"
@@ -22,21 +23,19 @@ logger = logging.getLogger(__name__)
 
 def build_recently_played_docs(raw_dir: Path, pattern: str) -> List[Document]:
     
-    blobs = read_json_dir(raw_dir, pattern=pattern)
     docs: List[Document] = []
-    for blob in blobs:
-        for item in blob.get("items", []):
-            played_at = item.get("played_at")
-            track = item.get("track", {})
-            name = track.get("name", "Unknown")
-            artists = ", ".join(a.get("name", "") for a in track.get("artists", []))
-            text = f"On {played_at}, you played '{name}' by {artists}."
-            metadata: Dict[str, Any] = {
-                "played_at": played_at,
-                "track_name": name,
-                "artists": artists
-            }
-            docs.append(Document(page_content=text, metadata=metadata))
+    for item in iter_play_history(raw_dir, pattern=pattern):
+        played_at = item.get("played_at")
+        track = item.get("track", {})
+        name = track.get("name", "Unknown")
+        artists = ", ".join(a.get("name", "") for a in track.get("artists", []))
+        text = f"On {played_at}, you played '{name}' by {artists}."
+        metadata: Dict[str, Any] = {
+            "played_at": played_at,
+            "track_name": name,
+            "artists": artists
+        }
+        docs.append(Document(page_content=text, metadata=metadata))
     logger.info("Built %d Document objects from recently played data", len(docs))
     return docs
 
@@ -96,8 +95,8 @@ if __name__ == "__main__":
     )
     parser.add_argument(
         "--pattern",
-        default="recently_played_*.json",
-        help="glob pattern for JSON files under data/raw/spotify_api"
+        default="recently_played_*",
+        help="glob pattern for JSON/NDJSON files under data/raw/spotify_api"
     )
     parser.add_argument(
         "--max_docs",
@@ -2,7 +2,8 @@ import streamlit as st
 import pandas as pd
 from pathlib import Path
 
-from src.preprocessing.utils import get_project_root
+from src.preprocessing.analytics_store import query_table
+from src.preprocessing.utils import get_project_root, read_df_csv
 
 
 def set_page_config():
@@ -15,11 +16,24 @@ def set_page_config():
 
 
 @st.cache_data
-def load_csv(name: str, index_col=None, parse_dates=None) -> pd.DataFrame:
+def load_csv(name: str, index_col=None, parse_dates=None, columns=None) -> pd.DataFrame:
     
     root = get_project_root()
     path = root / "data" / "processed" / name
-    return pd.read_csv(path, index_col=index_col, parse_dates=parse_dates)
+    kwargs = {}
+    if index_col is not None:
+        kwargs["index_col"] = index_col
+    if parse_dates is not None:
+        kwargs["parse_dates"] = parse_dates
+    return read_df_csv(path, columns=columns, **kwargs)
+
+
+@st.cache_data
+def load_table(name: str, columns=None, filters=None) -> pd.DataFrame:
+    
+    # filters is a list of (column, op, value) tuples, e.g.
+    # [("genre", "in", ["pop", "rock"]), ("energy", ">=", 0.5)].
+    return query_table(name, columns=columns, filters=filters)
 
 
 def show_key_metrics(df_tracks: pd.DataFrame):